@@ -7,7 +7,8 @@ LangGraph StateGraph 构建
             ↓ review_passed=False → Node_Synthesize (重写)
 
 终端节点调用路径追踪 (astream):
-  每个节点执行完后，自动打印调用路径和耗时到终端。
+  设置 AGENT_TRACE=true 且 app.agent.graph 日志级别为 DEBUG 时，
+  每个节点执行完以 DEBUG 日志输出调用路径和耗时。
 """
 
 from __future__ import annotations
@@ -19,6 +20,7 @@ from typing import Any, Awaitable, Callable
 from langgraph.graph import StateGraph, END
 
 from app.agent.state import AgentState
+from app.core.config import get_settings
 from app.agent.nodes.plan_node import plan_node
 from app.agent.nodes.patent_node import patent_node
 from app.agent.nodes.trend_node import trend_node
@@ -128,12 +130,24 @@ def build_graph() -> StateGraph:
     return graph
 
 
+# 编译后的 Runnable — 延迟初始化，进程内复用（每次运行传入全新 state）
+_compiled_app = None
+
+
 def compile_graph():
     """编译 StateGraph 为可执行的 Runnable"""
     graph = build_graph()
     return graph.compile()
 
 
+def get_compiled_graph():
+    """获取或编译 StateGraph 单例，避免每次请求重复构建图"""
+    global _compiled_app
+    if _compiled_app is None:
+        _compiled_app = compile_graph()
+    return _compiled_app
+
+
 async def run_agent(
     query: str,
     extra_context: str = "",
@@ -155,7 +169,7 @@ async def run_agent(
     Returns:
         最终的 AgentState
     """
-    app = compile_graph()
+    app = get_compiled_graph()
 
     initial_state: AgentState = {
         "query": query,
@@ -163,6 +177,7 @@ async def run_agent(
         "user_id": user_id,
         "plan": "",
         "search_keywords": [],
+        "review_rubric": [],
         "patents": [],
         "patent_analysis": "",
         "trends": [],
@@ -182,12 +197,12 @@ async def run_agent(
     logger.info(f"Running agent for query: '{query}', report_id: '{report_id}'")
 
     # ---- 节点调用路径追踪头 ----
-    _print_trace_header(query)
+    _trace_header(query)
 
     visited_nodes: list[str] = []
     start_time = time.monotonic()
     node_start_time = start_time
-    final_state = initial_state
+    final_state: AgentState = dict(initial_state)
 
     try:
         async for event in app.astream(initial_state):
@@ -195,10 +210,10 @@ async def run_agent(
                 elapsed = time.monotonic() - node_start_time
                 node_start_time = time.monotonic()
                 visited_nodes.append(node_name)
-                _print_node_trace(node_name, elapsed, node_output)
-                # 更新 final_state（astream 每步返回当前节点的输出）
+                _trace_node(node_name, elapsed, node_output)
+                # 原地合并 final_state（astream 每步返回当前节点的输出）
                 if isinstance(node_output, dict):
-                    final_state = {**final_state, **node_output}
+                    final_state.update(node_output)
 
                 # 向调用方推送进度事件
                 if progress_callback:
@@ -214,29 +229,34 @@ async def run_agent(
                     )
 
         total_elapsed = time.monotonic() - start_time
-        _print_trace_footer(visited_nodes, total_elapsed)
+        _trace_footer(visited_nodes, total_elapsed)
         logger.info("Agent execution completed successfully")
         return final_state
 
     except Exception as e:
         total_elapsed = time.monotonic() - start_time
-        _print_trace_error(e, total_elapsed)
+        _trace_error(e, total_elapsed)
         logger.error(f"Agent execution failed: {e}")
         initial_state["error"] = str(e)
         return initial_state
 
 
-# ---- 路径追踪辅助函数 ----
+# ---- 路径追踪辅助函数（仅 AGENT_TRACE=true 时以 DEBUG 级别写入日志）----
 
 
-def _print_trace_header(query: str) -> None:
-    print("\n" + "═" * 60)
-    print("  🤖 Agent Execution Path Trace")
-    print(f"  📦 Query: {query}")
-    print("═" * 60)
+def _trace_enabled() -> bool:
+    return get_settings().agent_trace and logger.isEnabledFor(logging.DEBUG)
 
 
-def _print_node_trace(node_name: str, elapsed: float, output: dict) -> None:
+def _trace_header(query: str) -> None:
+    if not _trace_enabled():
+        return
+    logger.debug("Agent execution path trace — query: %s", query)
+
+
+def _trace_node(node_name: str, elapsed: float, output: dict) -> None:
+    if not _trace_enabled():
+        return
     label = _NODE_LABELS.get(node_name, node_name)
     # 从输出中提取关键指标做简单摘要
     summary_parts = []
@@ -253,19 +273,21 @@ def _print_node_trace(node_name: str, elapsed: float, output: dict) -> None:
         if "search_keywords" in output:
             kws = output["search_keywords"]
             summary_parts.append(f"keywords={kws}")
-    summary = "  " + ", ".join(summary_parts) if summary_parts else ""
-    print(f"  ▶ [{node_name:12s}]  {label:<40s}  ({elapsed:.1f}s){summary}")
+    logger.debug(
+        "  ▶ [%-12s]  %-40s  (%.1fs)  %s",
+        node_name, label, elapsed, ", ".join(summary_parts),
+    )
 
 
-def _print_trace_footer(visited: list[str], total: float) -> None:
-    path = " → ".join(visited)
-    print("─" * 60)
-    print(f"  路径: {path}")
-    print(f"  ✅ Agent completed in {total:.1f}s")
-    print("═" * 60 + "\n")
+def _trace_footer(visited: list[str], total: float) -> None:
+    if not _trace_enabled():
+        return
+    logger.debug(
+        "Agent completed in %.1fs, path: %s", total, " → ".join(visited)
+    )
 
 
-def _print_trace_error(e: Exception, total: float) -> None:
-    print("─" * 60)
-    print(f"  ❌ Agent FAILED after {total:.1f}s: {e}")
-    print("═" * 60 + "\n")
+def _trace_error(e: Exception, total: float) -> None:
+    if not _trace_enabled():
+        return
+    logger.debug("Agent FAILED after %.1fs: %s", total, e)
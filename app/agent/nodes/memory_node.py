@@ -6,16 +6,37 @@ Node_Update_Memory — 记忆更新节点
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import uuid
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 
 from app.agent.state import AgentState
-from app.services.llm_service import LLMService
-from app.services.memory_service import MemoryService
+from app.core.database import get_session_factory
+from app.repositories.report_repo import ReportRepository
+from app.services.llm_service import get_llm_service
+from app.services.memory_service import get_memory_service
 
 logger = logging.getLogger(__name__)
 
+# 报告短于该长度视为无实质内容，不调用 LLM 摘要
+_MIN_REPORT_LENGTH = 200
+# 最近已摘要过的 (user_id, report_hash)，命中则跳过 LLM 摘要
+_SUMMARIZED_MAX_SIZE = 256
+_summarized_reports: OrderedDict[tuple[str, str], None] = OrderedDict()
+# 摘要上下文只保留报告末尾（结论 / 行动建议部分）的 token 数
+_REPORT_TAIL_TOKENS = 300
+# 摘要上下文模板：统计项在前，查询词与报告结论等高变化内容在后
+_SUMMARY_CONTEXT_TMPL = """
+搜索到 {patent_count} 篇专利
+分析了 {trend_count} 个趋势关键词
+查询关键词: {query}
+报告关键结论: {report_tail}
+"""
+
 
 async def memory_node(state: AgentState) -> AgentState:
     """
@@ -33,47 +54,120 @@ async def memory_node(state: AgentState) -> AgentState:
 
     logger.info(f"[Node_Update_Memory] Updating memory for user '{user_id}'")
 
-    # 1. 使用 LLM 生成摘要
-    context_to_summarize = f"""
-查询关键词: {query}
-搜索到 {patent_count} 篇专利
-分析了 {trend_count} 个趋势关键词
-报告关键结论: {final_report[:500] if final_report else '无报告'}
-"""
+    async def _summarize_and_store():
+        # 1. 使用 LLM 生成摘要（空报告 / 重复报告直接使用模板摘要）
+        summary = await _summarize(
+            query=query,
+            final_report=final_report,
+            user_id=user_id,
+            patent_count=patent_count,
+            trend_count=trend_count,
+        )
+        # 2. 写入 Mem0
+        return await get_memory_service().add_memory(
+            content=summary,
+            user_id=user_id,
+            metadata={
+                "query": query,
+                "timestamp": datetime.now().isoformat(),
+                "patent_count": patent_count,
+                "trend_count": trend_count,
+                "type": "analysis_session",
+            },
+        )
+
+    # 报告持久化不依赖摘要，与 LLM 摘要 / Mem0 写入并发执行；
+    # 同一 gather 内任一失败都不会遗留未等待的任务（失败仅记录日志）
+    memory_result, db_result = await asyncio.gather(
+        _summarize_and_store(),
+        _save_report_to_db(
+            report_id_str=report_id_str,
+            query=query,
+            full_report=final_report,
+            patent_summary=state.get("patent_analysis"),
+            trend_summary=state.get("trend_analysis"),
+            extra_context=state.get("extra_context"),
+            iteration_count=state.get("iteration_count", 0),
+            patent_count=patent_count,
+            trend_count=trend_count,
+        ),
+        return_exceptions=True,
+    )
 
-    llm_service = LLMService()
-    summary = await llm_service.summarize_for_memory(context_to_summarize)
+    if isinstance(memory_result, Exception):
+        logger.warning(f"[Node_Update_Memory] Failed to update memory: {memory_result}")
+    else:
+        logger.info("[Node_Update_Memory] Memory updated successfully")
+    if isinstance(db_result, Exception):
+        logger.warning(f"[Node_Update_Memory → DB] Failed to save report: {db_result}")
 
-    # 2. 写入 Mem0
-    memory_service = MemoryService()
-    await memory_service.add_memory(
-        content=summary,
-        user_id=user_id,
-        metadata={
-            "query": query,
-            "timestamp": datetime.now().isoformat(),
+    return state
+
+
+async def _summarize(
+    query: str,
+    final_report: str,
+    user_id: str,
+    patent_count: int,
+    trend_count: int,
+) -> str:
+    """生成记忆摘要；无实质内容或近期已摘要过的报告跳过 LLM 调用"""
+    if not final_report or len(final_report) < _MIN_REPORT_LENGTH:
+        logger.info("[Node_Update_Memory] Report too short, skipping LLM summary")
+        return (
+            f"查询 {query}: 搜索到 {patent_count} 篇专利，"
+            f"分析了 {trend_count} 个趋势关键词，未生成有效报告。"
+        )
+
+    report_hash = hashlib.md5(final_report.encode("utf-8")).hexdigest()[:12]
+    cache_key = (user_id, report_hash)
+    if cache_key in _summarized_reports:
+        _summarized_reports.move_to_end(cache_key)
+        logger.info(
+            f"[Node_Update_Memory] Report {report_hash} already summarized, "
+            "skipping LLM summary"
+        )
+        return f"重复分析: {query} (hash={report_hash})"
+
+    context_to_summarize = _SUMMARY_CONTEXT_TMPL.format_map(
+        {
             "patent_count": patent_count,
             "trend_count": trend_count,
-            "type": "analysis_session",
-        },
+            "query": query,
+            "report_tail": _report_tail(final_report),
+        }
     )
 
-    logger.info("[Node_Update_Memory] Memory updated successfully")
-
-    # 3. 持久化最终报告到数据库
-    await _save_report_to_db(
-        report_id_str=report_id_str,
-        query=query,
-        full_report=final_report,
-        patent_summary=state.get("patent_analysis"),
-        trend_summary=state.get("trend_analysis"),
-        extra_context=state.get("extra_context"),
-        iteration_count=state.get("iteration_count", 0),
-        patent_count=patent_count,
-        trend_count=trend_count,
-    )
+    llm_service = get_llm_service()
+    summary = await llm_service.summarize_for_memory(context_to_summarize)
 
-    return state
+    _summarized_reports[cache_key] = None
+    if len(_summarized_reports) > _SUMMARIZED_MAX_SIZE:
+        _summarized_reports.popitem(last=False)
+    return summary
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """懒加载 tiktoken 编码器（首次使用可能需要下载 BPE 文件，失败时返回 None）"""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"[Node_Update_Memory] tiktoken unavailable, fallback to chars: {e}")
+        return None
+
+
+def _report_tail(report: str) -> str:
+    """按 token 截取报告末尾，避免按字符切分截断多字节字符或句子"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return report[-_REPORT_TAIL_TOKENS * 2 :]
+    tokens = encoding.encode(report)
+    if len(tokens) <= _REPORT_TAIL_TOKENS:
+        return report
+    return encoding.decode(tokens[-_REPORT_TAIL_TOKENS:])
 
 
 async def _save_report_to_db(
@@ -89,9 +183,6 @@ async def _save_report_to_db(
 ) -> None:
     """将最终报告更新到数据库（状态: completed）"""
     try:
-        from app.core.database import get_session_factory
-        from app.repositories.report_repo import ReportRepository
-
         factory = get_session_factory()
         async with factory() as session:
             repo = ReportRepository(session)
@@ -7,14 +7,31 @@ Node_Fetch_Patents — 专利搜索节点 (Tools)
 
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from app.agent.state import AgentState
-from app.services.patent_service import PatentService
-from app.services.llm_service import LLMService
+from app.core.database import get_session_factory
+from app.repositories.patent_repo import PatentRepository, parse_patent_date
+from app.services.patent_service import get_patent_service
+from app.services.llm_service import get_llm_service
 
 logger = logging.getLogger(__name__)
 
+# 最多取前 3 个关键词避免过多请求；并发上限与之相同
+_MAX_SEARCH_KEYWORDS = 3
+_SEARCH_CONCURRENCY = 3
+
+# 可空字符串字段及其数据库列长度上限（超长截断，空串存 NULL）
+_NULLABLE_STR_LIMITS = (
+    ("assignee", 300),
+    ("patent_id", 50),
+    ("publication_number", 100),
+    ("inventor", 500),
+)
+# 日期字段（写库前解析为 date）
+_DATE_FIELDS = ("filing_date", "priority_date", "publication_date")
+
 
 async def patent_node(state: AgentState) -> AgentState:
     """
@@ -32,33 +49,41 @@ async def patent_node(state: AgentState) -> AgentState:
         f"countries={countries or 'ALL'}"
     )
 
-    patent_service = PatentService()
-    llm_service = LLMService()
+    patent_service = get_patent_service()
+    llm_service = get_llm_service()
+
+    # 1. 并发搜索专利（传入国家筛选），单个关键词失败不影响其他关键词
+    keywords = search_keywords[:_MAX_SEARCH_KEYWORDS]
+    semaphore = asyncio.Semaphore(_SEARCH_CONCURRENCY)
+
+    async def _search(kw: str) -> list[dict]:
+        async with semaphore:
+            return await patent_service.search_patents(kw, countries=countries or None)
+
+    results = await asyncio.gather(
+        *(_search(kw) for kw in keywords), return_exceptions=True
+    )
 
-    # 1. 搜索专利（传入国家筛选）
     all_patents = []
-    for kw in search_keywords[:3]:  # 最多取前 3 个关键词避免过多请求
-        patents = await patent_service.search_patents(kw, countries=countries or None)
-        all_patents.extend(patents)
-
-    # 去重（按 patent_id）
-    seen_ids = set()
-    unique_patents = []
-    for p in all_patents:
-        pid = p.get("patent_id", "")
-        if pid and pid not in seen_ids:
-            seen_ids.add(pid)
-            unique_patents.append(p)
-        elif not pid:
-            unique_patents.append(p)
+    for kw, result in zip(keywords, results):
+        if isinstance(result, Exception):
+            logger.warning(f"[Node_Fetch_Patents] Search failed for '{kw}': {result}")
+            continue
+        all_patents.extend(result)
+
+    # 去重（按 patent_id，保留首次出现的顺序；无 patent_id 的专利全部保留）
+    unique_by_key: dict[str, dict] = {}
+    for i, p in enumerate(all_patents):
+        unique_by_key.setdefault(p.get("patent_id") or f"__anon_{i}", p)
+    unique_patents = list(unique_by_key.values())
 
     logger.info(f"[Node_Fetch_Patents] Found {len(unique_patents)} unique patents")
 
-    # 2. LLM 分析专利格局
-    analysis_result = await llm_service.analyze_patents(unique_patents, query)
-
-    # 3. 持久化到数据库
-    await _save_patents_to_db(unique_patents, query)
+    # 2. LLM 分析专利格局 + 3. 持久化到数据库（两者互不依赖，并发执行）
+    analysis_result, _ = await asyncio.gather(
+        llm_service.analyze_patents(unique_patents, query),
+        _save_patents_to_db(unique_patents, query),
+    )
 
     return {
         "patents": unique_patents,
@@ -67,74 +92,47 @@ async def patent_node(state: AgentState) -> AgentState:
 
 
 async def _save_patents_to_db(patents: list[dict], search_query: str) -> None:
-    """将专利数据批量写入数据库（完整字段，自动跳过已存在的专利）"""
+    """将专利数据批量写入数据库（完整字段，同一查询词下已存在的 patent_id 由数据库跳过）"""
     if not patents:
         return
 
     try:
-        from app.core.database import get_session_factory
-        from app.repositories.patent_repo import PatentRepository
-        from app.models.patent import Patent
-
         factory = get_session_factory()
         async with factory() as session:
             repo = PatentRepository(session)
 
-            # ---- 去重：查询数据库中已存在的 patent_id ----
-            incoming_ids = [p.get("patent_id") for p in patents if p.get("patent_id")]
-            existing_ids: set[str] = set()
-            if incoming_ids:
-                existing_ids = await repo.find_existing_patent_ids(incoming_ids)
-
-            # 过滤掉数据库中已存在的专利（patent_id 为空的仍然插入）
-            new_patents = [
-                p
-                for p in patents
-                if not p.get("patent_id") or p["patent_id"] not in existing_ids
-            ]
-
-            skipped = len(patents) - len(new_patents)
-            if skipped > 0:
-                logger.info(
-                    f"[Node_Fetch_Patents → DB] Skipped {skipped} duplicate patents "
-                    f"(already in database)"
-                )
-
-            if not new_patents:
-                logger.info(
-                    f"[Node_Fetch_Patents → DB] All {len(patents)} patents already exist "
-                    f"for query='{search_query}', nothing to insert"
-                )
-                return
-
-            patent_records = [
-                Patent(
-                    title=p.get("title", "Unknown")[:500],
-                    assignee=(p.get("assignee") or "")[:300] or None,
-                    abstract=p.get("abstract"),
-                    patent_id=(p.get("patent_id") or "")[:50] or None,
-                    publication_number=(p.get("publication_number") or "")[:100]
-                    or None,
-                    filing_date=(p.get("filing_date") or "")[:30] or None,
-                    priority_date=(p.get("priority_date") or "")[:30] or None,
-                    publication_date=(p.get("publication_date") or "")[:30] or None,
-                    inventor=(p.get("inventor") or "")[:500] or None,
-                    pdf_url=p.get("pdf_url") or None,
-                    thumbnail_url=p.get("thumbnail_url") or None,
-                    figures=p.get("figures") or [],
-                    country_status=p.get("country_status") or {},
-                    search_query=search_query[:200],
-                    source=p.get("source", "serpapi")[:20],
-                    tech_points=p.get("tech_points"),
-                    raw_data=p,
-                )
-                for p in new_patents
-            ]
-            await repo.bulk_create(patent_records)
+            # 去重交给 ON CONFLICT (search_query, patent_id) DO NOTHING（patent_id 为空的仍然插入）
+            patent_rows = [_to_patent_row(p, search_query) for p in patents]
+            saved = await repo.copy_insert_ignore_duplicates(patent_rows)
+            skipped = len(patent_rows) - saved
+            if saved:
+                await repo.on_patents_written()
             logger.info(
-                f"[Node_Fetch_Patents → DB] Saved {len(patent_records)} new patents "
+                f"[Node_Fetch_Patents → DB] Saved {saved} new patents "
                 f"(skipped {skipped} duplicates) for query='{search_query}'"
             )
     except Exception as e:
         # DB 写入失败不中断主流程
         logger.warning(f"[Node_Fetch_Patents → DB] Failed to save patents: {e}")
+
+
+def _to_patent_row(p: dict, search_query: str) -> dict:
+    """将专利字典转换为 patents 表的插入行（单次遍历完成截断）"""
+    row = {
+        field: (p.get(field) or "")[:limit] or None
+        for field, limit in _NULLABLE_STR_LIMITS
+    }
+    row.update((field, parse_patent_date(p.get(field))) for field in _DATE_FIELDS)
+    row.update(
+        title=p.get("title", "Unknown")[:500],
+        abstract=p.get("abstract"),
+        pdf_url=p.get("pdf_url") or None,
+        thumbnail_url=p.get("thumbnail_url") or None,
+        figures=p.get("figures") or [],
+        country_status=p.get("country_status") or {},
+        search_query=search_query[:200],
+        source=p.get("source", "serpapi")[:20],
+        tech_points=p.get("tech_points"),
+        raw_data=p,
+    )
+    return row
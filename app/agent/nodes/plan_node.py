@@ -6,14 +6,52 @@ Node_Plan — 任务规划节点 (Reflect 1)
 """
 from __future__ import annotations
 
+import ast
+import json
 import logging
+import re
 
 from app.agent.state import AgentState
-from app.services.llm_service import LLMService
-from app.services.memory_service import MemoryService
+from app.services.llm_service import get_llm_service
+from app.services.memory_service import get_memory_service
 
 logger = logging.getLogger(__name__)
 
+# 匹配计划文本中的字符串数组，如 ["kw1", 'kw2']；字符串内不含引号，无嵌套量词，不会灾难性回溯
+_KEYWORDS_RE = re.compile(
+    r"""\[\s*(?:"[^"]*"|'[^']*')(?:\s*,\s*(?:"[^"]*"|'[^']*'))*\s*\]"""
+)
+# 匹配计划文本中的审核要点: "review_rubric": ["...", ...]
+_RUBRIC_RE = re.compile(r'"review_rubric"\s*:\s*(\[[^\[\]]*\])')
+# 审核要点条目数上限，避免 LLM 输出过多条目
+_MAX_RUBRIC_ITEMS = 8
+
+_PLAN_SYSTEM_PROMPT = "你是合规推理智能体的规划模块，负责制定详细的数据采集和分析计划。"
+# 规划 prompt 模板：固定指令在前、可变内容在后，使各次请求共享尽可能长的相同前缀，
+# 便于服务端 prompt 缓存命中
+_PLAN_PROMPT_TMPL = """你是一位合规分析智能体的规划模块。请根据文末的用户查询、额外上下文和历史记忆制定数据采集和分析计划。
+
+请输出：
+1. **分析目标**: 针对该产品/类目的合规分析重点
+2. **搜索关键词**: 列出 3-5 个用于专利搜索和趋势分析的关键词（JSON 数组格式）
+3. **数据采集计划**: 需要从哪些数据源获取什么类型的数据
+4. **预期输出**: 最终报告应包含哪些模块
+5. **审核要点**: 列出 3-6 个最终报告必须出现的关键短语（用于报告审核）；
+   每条必须针对本次查询，包含产品名或搜索关键词，不要使用"风险""增长率"等通用词
+
+请在关键词部分使用如下格式: ["keyword1", "keyword2", "keyword3"]
+请在审核要点部分使用如下格式: {{"review_rubric": ["要点1", "要点2", "要点3"]}}
+
+## 历史记忆
+{memory_context}
+
+## 额外上下文
+{extra_context}
+
+## 用户查询
+{query}
+"""
+
 
 async def plan_node(state: AgentState) -> AgentState:
     """
@@ -29,51 +67,40 @@ async def plan_node(state: AgentState) -> AgentState:
     logger.info(f"[Node_Plan] Starting plan for query: '{query}'")
 
     # 1. 获取历史记忆上下文
-    memory_service = MemoryService()
+    memory_service = get_memory_service()
     memory_context = await memory_service.get_context_for_agent(query, user_id)
 
     # 2. 调用 LLM 制定计划
-    llm_service = LLMService()
-    plan_prompt = f"""你是一位合规分析智能体的规划模块。请根据以下信息制定数据采集和分析计划。
-
-## 用户查询
-{query}
-
-## 额外上下文
-{extra_context or "无"}
-
-## 历史记忆
-{memory_context}
-
-请输出：
-1. **分析目标**: 针对该产品/类目的合规分析重点
-2. **搜索关键词**: 列出 3-5 个用于专利搜索和趋势分析的关键词（JSON 数组格式）
-3. **数据采集计划**: 需要从哪些数据源获取什么类型的数据
-4. **预期输出**: 最终报告应包含哪些模块
-
-请在关键词部分使用如下格式: ["keyword1", "keyword2", "keyword3"]
-"""
+    llm_service = get_llm_service()
+    plan_prompt = _PLAN_PROMPT_TMPL.format_map(
+        {
+            "memory_context": memory_context,
+            "extra_context": extra_context or "无",
+            "query": query,
+        }
+    )
 
     plan = await llm_service.chat(
         [
-            {
-                "role": "system",
-                "content": "你是合规推理智能体的规划模块，负责制定详细的数据采集和分析计划。",
-            },
+            {"role": "system", "content": _PLAN_SYSTEM_PROMPT},
             {"role": "user", "content": plan_prompt},
         ]
     )
 
-    # 3. 从计划中提取关键词
-    search_keywords = _extract_keywords(plan, query)
+    # 3. 从计划中提取审核要点和关键词（先剔除审核要点，避免其数组被误认为关键词）
+    review_rubric, plan_without_rubric = _extract_rubric(plan)
+    search_keywords = _extract_keywords(plan_without_rubric, query)
+    review_rubric = _query_specific_rubric(review_rubric, [query, *search_keywords])
 
     logger.info(
-        f"[Node_Plan] Plan created. Keywords: {search_keywords}"
+        f"[Node_Plan] Plan created. Keywords: {search_keywords}, "
+        f"rubric: {review_rubric}"
     )
 
     return {
         "plan": plan,
         "search_keywords": search_keywords,
+        "review_rubric": review_rubric,
         "memory_context": memory_context,
         "iteration_count": 0,
     }
@@ -81,25 +108,45 @@ async def plan_node(state: AgentState) -> AgentState:
 
 def _extract_keywords(plan: str, fallback_query: str) -> list[str]:
     """从计划文本中提取关键词列表"""
-    import json
-    import re
-
-    # 尝试从计划中提取 JSON 数组
-    patterns = [
-        r'\[(["\'].*?["\'](?:\s*,\s*["\'].*?["\'])*)\]',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, plan)
-        if match:
+    match = _KEYWORDS_RE.search(plan)
+    if match:
+        literal = match.group(0)
+        try:
+            keywords = json.loads(literal)
+        except json.JSONDecodeError:
+            # 单引号数组不是合法 JSON，按 Python 字面量解析
             try:
-                keywords = json.loads(f"[{match.group(1)}]")
-                if keywords:
-                    return keywords
-            except (json.JSONDecodeError, TypeError):
-                continue
+                keywords = ast.literal_eval(literal)
+            except (ValueError, SyntaxError):
+                keywords = []
+        if keywords:
+            return list(keywords)
 
     # 如果提取失败，使用原始查询拆分
     return [fallback_query] + [
         w for w in fallback_query.split() if len(w) > 2
     ]
+
+
+def _extract_rubric(plan: str) -> tuple[list[str], str]:
+    """从计划文本中提取审核要点，返回 (要点列表, 剔除要点后的计划文本)"""
+    match = _RUBRIC_RE.search(plan)
+    if not match:
+        return [], plan
+    try:
+        items = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        items = []
+    rubric = [
+        item.strip() for item in items if isinstance(item, str) and item.strip()
+    ][:_MAX_RUBRIC_ITEMS]
+    return rubric, plan[: match.start()] + plan[match.end() :]
+
+
+def _query_specific_rubric(rubric: list[str], terms: list[str]) -> list[str]:
+    """只保留包含查询词或搜索关键词的审核要点；通用要点几乎出现在任何草稿中，无法区分报告质量"""
+    lowered_terms = [t.strip().lower() for t in terms if t and len(t.strip()) >= 2]
+    return [
+        item for item in rubric
+        if any(term in item.lower() for term in lowered_terms)
+    ]
@@ -9,10 +9,17 @@ import logging
 
 from app.agent.state import AgentState
 from app.core.config import get_yaml_config
-from app.services.llm_service import LLMService
+from app.services.llm_service import get_llm_service
 
 logger = logging.getLogger(__name__)
 
+# 结构预检：报告必须涵盖的章节关键词（对应 generate_report 要求的模块）
+_REQUIRED_SECTIONS = ("专利", "趋势", "风险", "建议")
+# 结构预检：报告最小长度（字符）
+_MIN_REPORT_LENGTH = 1000
+# 审核要点少于该条数时不足以替代 LLM 审核
+_MIN_RUBRIC_ITEMS = 3
+
 
 async def review_node(state: AgentState) -> AgentState:
     """
@@ -40,8 +47,28 @@ async def review_node(state: AgentState) -> AgentState:
             "review_feedback": "已达最大迭代次数，自动通过。",
         }
 
+    # 结构预检：明显不合格的草稿直接打回，省去一次 LLM 审核
+    structural_feedback = _structural_check(draft)
+    if structural_feedback:
+        logger.info(f"[Node_Review] Structural check FAILED: {structural_feedback}")
+        return {
+            "final_report": state.get("final_report", ""),
+            "review_passed": False,
+            "review_feedback": structural_feedback,
+        }
+
+    # 针对本次查询的审核要点足够且全部命中：确定性通过，省去一次 LLM 审核
+    rubric = state.get("review_rubric", [])
+    if len(rubric) >= _MIN_RUBRIC_ITEMS and all(item.lower() in draft.lower() for item in rubric):
+        logger.info(f"[Node_Review] Review PASSED by rubric ({len(rubric)} items)")
+        return {
+            "final_report": draft,
+            "review_passed": True,
+            "review_feedback": "报告满足规划阶段的全部审核要点，自动通过。",
+        }
+
     # LLM 审核
-    llm_service = LLMService()
+    llm_service = get_llm_service()
     review_result = await llm_service.review_report(draft)
 
     passed = review_result.get("passed", False)
@@ -54,3 +81,15 @@ async def review_node(state: AgentState) -> AgentState:
         "review_passed": passed,
         "review_feedback": feedback,
     }
+
+
+def _structural_check(draft: str) -> str:
+    """廉价的结构检查，不合格时返回反馈文本，合格返回空字符串"""
+    if draft.startswith("[LLM Error]"):
+        return "报告生成失败，请重新生成。"
+    if len(draft) < _MIN_REPORT_LENGTH:
+        return f"报告过短（{len(draft)} 字符，至少 {_MIN_REPORT_LENGTH}），请补充完整各章节内容。"
+    missing = [section for section in _REQUIRED_SECTIONS if section not in draft]
+    if missing:
+        return f"报告缺少必要章节: {', '.join(missing)}"
+    return ""
@@ -6,12 +6,19 @@ Node_Synthesize — 报告生成节点 (Action)
 from __future__ import annotations
 
 import logging
+from typing import AsyncIterator
 
 from app.agent.state import AgentState
-from app.services.llm_service import LLMService
+from app.core.config import get_yaml_config
+from app.services.llm_service import get_llm_service
 
 logger = logging.getLogger(__name__)
 
+# 流式生成达到该长度时做一次早期结构检查
+_EARLY_CHECK_LENGTH = 2000
+# 报告按「执行摘要 → 专利格局分析 → ...」顺序输出，到检查点时应已进入专利章节
+_EARLY_REQUIRED_SECTION = "专利"
+
 
 async def synthesize_node(state: AgentState) -> AgentState:
     """
@@ -29,7 +36,7 @@ async def synthesize_node(state: AgentState) -> AgentState:
         f"[Node_Synthesize] Generating report (iteration {iteration})"
     )
 
-    llm_service = LLMService()
+    llm_service = get_llm_service()
 
     # 如果是重写（有审核反馈），加入反馈信息
     if review_feedback and iteration > 0:
@@ -41,11 +48,16 @@ async def synthesize_node(state: AgentState) -> AgentState:
     else:
         extra_context_full = extra_context
 
-    # 生成报告
-    report = await llm_service.generate_report(
-        patent_analysis=patent_analysis,
-        trend_data=trend_analysis,
-        extra_context=extra_context_full,
+    # 流式生成报告，明显偏题时提前中断（由 Node_Review 结构预检打回重写）；
+    # 最后一次机会不中断：达到迭代上限时 Node_Review 会直接采用草稿，不能是截断的半成品
+    last_attempt = iteration + 1 >= get_yaml_config().agent.max_review_iterations
+    report = await _generate_with_early_check(
+        llm_service.stream_report(
+            patent_analysis=patent_analysis,
+            trend_data=trend_analysis,
+            extra_context=extra_context_full,
+        ),
+        early_check=not last_attempt,
     )
 
     logger.info(
@@ -56,3 +68,27 @@ async def synthesize_node(state: AgentState) -> AgentState:
         "draft_report": report,
         "iteration_count": iteration + 1,
     }
+
+
+async def _generate_with_early_check(
+    stream: AsyncIterator[str], early_check: bool = True
+) -> str:
+    """消费流式报告；到达检查点仍未出现专利章节则取消生成，节省 token"""
+    chunks: list[str] = []
+    length = 0
+    checked = not early_check
+    try:
+        async for chunk in stream:
+            chunks.append(chunk)
+            length += len(chunk)
+            if not checked and length >= _EARLY_CHECK_LENGTH:
+                checked = True
+                if _EARLY_REQUIRED_SECTION not in "".join(chunks):
+                    logger.warning(
+                        f"[Node_Synthesize] No '{_EARLY_REQUIRED_SECTION}' section "
+                        f"after {length} chars, aborting generation"
+                    )
+                    break
+    finally:
+        await stream.aclose()
+    return "".join(chunks)
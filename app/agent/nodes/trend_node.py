@@ -7,12 +7,23 @@ Node_Fetch_Trends — 趋势数据获取节点 (Tools)
 from __future__ import annotations
 
 import logging
+import uuid
 
 from app.agent.state import AgentState
-from app.services.trend_service import TrendService
+from app.core.database import get_session_factory
+from app.repositories.trend_repo import TrendRepository
+from app.services.trend_service import get_trend_service
 
 logger = logging.getLogger(__name__)
 
+# 行数达到该阈值时改用 PostgreSQL COPY 写入，低于阈值 ORM 批量插入开销可忽略
+_COPY_THRESHOLD = 100
+
+_TREND_TABLE_HEADER = (
+    "| 关键词 | CAGR | 起始值 | 结束值 | 时间范围(月) |\n"
+    "|--------|------|--------|--------|-------------|\n"
+)
+
 
 async def trend_node(state: AgentState) -> AgentState:
     """
@@ -26,7 +37,7 @@ async def trend_node(state: AgentState) -> AgentState:
 
     logger.info(f"[Node_Fetch_Trends] Fetching trends for: {search_keywords}")
 
-    trend_service = TrendService()
+    trend_service = get_trend_service()
 
     # 拉取趋势数据
     result = await trend_service.fetch_trends(search_keywords)
@@ -35,24 +46,16 @@ async def trend_node(state: AgentState) -> AgentState:
     summaries = result.get("summaries", [])
 
     # 格式化趋势分析文本
-    trend_text_parts = ["## 趋势数据摘要\n"]
-
+    trend_analysis = "## 趋势数据摘要\n"
     if summaries:
-        trend_text_parts.append("| 关键词 | CAGR | 起始值 | 结束值 | 时间范围(月) |")
-        trend_text_parts.append("|--------|------|--------|--------|-------------|")
-
-        for s in summaries:
-            cagr_str = (
-                f"{s['cagr'] * 100:.2f}%"
-                if s.get("cagr") is not None
-                else "N/A"
-            )
-            trend_text_parts.append(
-                f"| {s['keyword']} | {cagr_str} | {s.get('beginning_value', 'N/A')} | "
-                f"{s.get('ending_value', 'N/A')} | {s.get('timeframe_months', 'N/A')} |"
-            )
-
-    trend_analysis = "\n".join(trend_text_parts)
+        trend_analysis += "\n" + _TREND_TABLE_HEADER + "\n".join(
+            [
+                f"| {s['keyword']} | {_fmt_cagr(s.get('cagr'))} | "
+                f"{s.get('beginning_value', 'N/A')} | {s.get('ending_value', 'N/A')} | "
+                f"{s.get('timeframe_months', 'N/A')} |"
+                for s in summaries
+            ]
+        )
 
     logger.info(
         f"[Node_Fetch_Trends] Got {len(trends)} data points, {len(summaries)} summaries"
@@ -68,6 +71,11 @@ async def trend_node(state: AgentState) -> AgentState:
     }
 
 
+def _fmt_cagr(cagr: float | None) -> str:
+    """CAGR 格式化为百分比，缺失时为 N/A"""
+    return f"{cagr * 100:.2f}%" if cagr is not None else "N/A"
+
+
 async def _save_trends_to_db(
     trends: list[dict],
     summaries: list[dict],
@@ -77,50 +85,58 @@ async def _save_trends_to_db(
     if not trends and not summaries:
         return
 
-    try:
-        from app.core.database import get_session_factory
-        from app.repositories.trend_repo import TrendRepository
-        from app.models.trend import TrendData, TrendSummary
+    # 每批共用的值只计算一次；date / source 由 TrendService 生成，长度固定在列宽内，
+    # 仅关键词来自 LLM 规划结果，需要按列宽截断
+    query = search_query[:200]
+    data_rows = [
+        (
+            uuid.uuid4(),
+            (t.get("keyword") or query)[:200],
+            str(t.get("date") or ""),
+            t.get("value"),
+            t.get("source") or "pytrends",
+            query,
+        )
+        for t in trends
+    ]
+    summary_rows = [
+        (
+            uuid.uuid4(),
+            (s.get("keyword") or query)[:200],
+            query,
+            s.get("cagr"),
+            s.get("cmgr"),
+            s.get("beginning_value"),
+            s.get("ending_value"),
+            s.get("source") or "pytrends",
+            s.get("timeframe_months"),
+        )
+        for s in summaries
+    ]
 
+    try:
         factory = get_session_factory()
         async with factory() as session:
             repo = TrendRepository(session)
 
             # 写入原始时序数据
-            if trends:
-                trend_records = [
-                    TrendData(
-                        keyword=t.get("keyword", search_query)[:200],
-                        date=str(t.get("date", ""))[:30],
-                        value=t.get("value"),
-                        source=t.get("source", "pytrends")[:20],
-                        search_query=search_query[:200],
-                    )
-                    for t in trends
-                ]
-                await repo.bulk_create_data(trend_records)
+            if data_rows:
+                if len(data_rows) >= _COPY_THRESHOLD:
+                    count = await repo.copy_data(data_rows)
+                else:
+                    count = await repo.insert_data(data_rows)
                 logger.info(
-                    f"[Node_Fetch_Trends → DB] Saved {len(trend_records)} trend data points"
+                    f"[Node_Fetch_Trends → DB] Saved {count} trend data points"
                 )
 
             # 写入 CAGR 摘要
-            if summaries:
-                summary_records = [
-                    TrendSummary(
-                        keyword=s.get("keyword", search_query)[:200],
-                        search_query=search_query[:200],
-                        cagr=s.get("cagr"),
-                        cmgr=s.get("cmgr"),
-                        beginning_value=s.get("beginning_value"),
-                        ending_value=s.get("ending_value"),
-                        source=s.get("source", "pytrends")[:20],
-                        timeframe_months=s.get("timeframe_months"),
-                    )
-                    for s in summaries
-                ]
-                await repo.bulk_create_summaries(summary_records)
+            if summary_rows:
+                if len(summary_rows) >= _COPY_THRESHOLD:
+                    count = await repo.copy_summaries(summary_rows)
+                else:
+                    count = await repo.insert_summaries(summary_rows)
                 logger.info(
-                    f"[Node_Fetch_Trends → DB] Saved {len(summary_records)} trend summaries"
+                    f"[Node_Fetch_Trends → DB] Saved {count} trend summaries"
                 )
 
     except Exception as e:
@@ -2,17 +2,50 @@
 Agent 状态定义 (AgentState)
 LangGraph StateGraph 的状态字典
 
-注意：patents/trends/trend_summaries/search_keywords 使用 Annotated[list, operator.add]
+注意：patents/trends/trend_summaries/search_keywords 使用 Annotated[list, reducer]
       是因为 plan → patents 和 plan → trends 并行执行，两个节点都可能更新列表字段，
-      LangGraph 需要一个 reducer 函数（此处为 add，即合并列表）来避免并发冲突。
+      LangGraph 需要一个 reducer 函数（合并列表）来避免并发冲突。
 """
 
 from __future__ import annotations
 
-import operator
 from typing import Annotated, Any, TypedDict
 
 
+def merge_lists(a: list | None, b: list | None) -> list:
+    """合并列表；任一侧为空时直接返回另一侧，不做拷贝"""
+    if not b:
+        return a or []
+    if not a:
+        return b
+    out = a.copy()
+    out.extend(b)
+    return out
+
+
+def merge_unique(a: list[str] | None, b: list[str] | None) -> list[str]:
+    """合并并去重（保持首次出现顺序），避免并行节点重复追加同一关键词"""
+    if not b:
+        return a or []
+    if not a:
+        return b
+    return list(dict.fromkeys([*a, *b]))
+
+
+def merge_patents(
+    a: list[dict[str, Any]] | None, b: list[dict[str, Any]] | None
+) -> list[dict[str, Any]]:
+    """合并专利列表，按 patent_id 去重（无 patent_id 的条目全部保留）"""
+    if not b:
+        return a or []
+    if not a:
+        return b
+    seen = {p.get("patent_id") for p in a if p.get("patent_id")}
+    out = a.copy()
+    out.extend(p for p in b if not p.get("patent_id") or p["patent_id"] not in seen)
+    return out
+
+
 class AgentState(TypedDict, total=False):
     """合规推理智能体的全局状态"""
 
@@ -26,20 +59,22 @@ class AgentState(TypedDict, total=False):
     # ---- Node_Plan 输出 ----
     # 任务规划描述
     plan: str
-    # 需要搜索的关键词列表（Annotated：并行节点写入时自动合并，不冲突）
-    search_keywords: Annotated[list[str], operator.add]
+    # 需要搜索的关键词列表（Annotated：并行节点写入时自动合并去重，不冲突）
+    search_keywords: Annotated[list[str], merge_unique]
+    # 审核要点：报告必须出现的章节/关键短语，全部命中时 Node_Review 可跳过 LLM 审核
+    review_rubric: list[str]
 
     # ---- Node_Fetch_Patents 输出 ----
-    # 专利原始数据列表（Annotated：并行节点写入时自动合并）
-    patents: Annotated[list[dict[str, Any]], operator.add]
+    # 专利原始数据列表（Annotated：并行节点写入时按 patent_id 合并去重）
+    patents: Annotated[list[dict[str, Any]], merge_patents]
     # LLM 专利分析结果
     patent_analysis: str
 
     # ---- Node_Fetch_Trends 输出 ----
     # 趋势原始数据（Annotated：并行节点写入时自动合并）
-    trends: Annotated[list[dict[str, Any]], operator.add]
+    trends: Annotated[list[dict[str, Any]], merge_lists]
     # CAGR 计算结果（Annotated：并行节点写入时自动合并）
-    trend_summaries: Annotated[list[dict[str, Any]], operator.add]
+    trend_summaries: Annotated[list[dict[str, Any]], merge_lists]
     # 趋势分析文本
     trend_analysis: str
 
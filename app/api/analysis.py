@@ -6,24 +6,33 @@ Controller 层
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agent.graph import run_agent
-from app.core.database import get_db_session
+from app.core.cache import AsyncTTLCache
+from app.core.database import get_db_session, get_session_factory
+from app.core.responses import ORJSONResponse
 from app.models.report import AnalysisReport
 from app.repositories.report_repo import ReportRepository
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
+# 历史列表缓存；新建报告及工作流结束（状态变化）时失效
+_history_cache = AsyncTTLCache(ttl=30, maxsize=16)
+# SSE 事件队列容量：消费端变慢时 agent 写入会等待（背压），内存占用有上界
+_SSE_QUEUE_SIZE = 64
+# 队列空闲时检查客户端是否断开的间隔（秒）
+_SSE_DISCONNECT_POLL_SECONDS = 5.0
+
 
 # ---- 请求/响应模型 ----
 class AnalysisRequest(BaseModel):
@@ -89,6 +98,7 @@ async def run_analysis(
         status="running",
     )
     await repo.create(db_report)
+    _history_cache.invalidate()
 
     report_id_str = str(report_id)
     logger.info(
@@ -135,10 +145,12 @@ async def run_analysis(
         except Exception:
             pass
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        _history_cache.invalidate()
 
 
 @router.post("/run_stream")
-async def run_analysis_stream(request: AnalysisRequest):
+async def run_analysis_stream(request: AnalysisRequest, http_request: Request):
     """
     SSE 流式分析端点 — 实时推送节点执行进度
 
@@ -146,8 +158,6 @@ async def run_analysis_stream(request: AnalysisRequest):
       data: {"type":"node_complete","node":"plan","elapsed":2.3,"summary":"..."}
       data: {"type":"result","data":{...}}
     """
-    from app.core.database import get_session_factory
-
     factory = get_session_factory()
     report_id = uuid.uuid4()
     report_id_str = str(report_id)
@@ -162,14 +172,15 @@ async def run_analysis_stream(request: AnalysisRequest):
             status="running",
         )
         await repo.create(db_report)
+    _history_cache.invalidate()
 
     logger.info(
         f"[API/Stream] Starting analysis: query='{request.query}', "
         f"report_id={report_id_str}"
     )
 
-    # 2. 异步队列：agent 写入进度事件 → SSE 生成器读取
-    queue: asyncio.Queue[dict | None] = asyncio.Queue()
+    # 2. 有界异步队列：agent 写入进度事件 → SSE 生成器读取
+    queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=_SSE_QUEUE_SIZE)
 
     async def _progress_callback(event: dict) -> None:
         await queue.put(event)
@@ -208,7 +219,18 @@ async def run_analysis_stream(request: AnalysisRequest):
                 "error": final_state.get("error"),
             }
             await queue.put({"type": "result", "data": result})
+            await queue.put(None)  # 哨兵：通知生成器结束
 
+        except asyncio.CancelledError:
+            # 客户端断开导致取消：标记失败后继续传播取消（无人消费，不再写队列）
+            logger.info(f"[API/Stream] Client gone, agent cancelled: {report_id_str}")
+            try:
+                async with factory() as session:
+                    repo = ReportRepository(session)
+                    await repo.update_status(report_id, "failed")
+            except Exception:
+                pass
+            raise
         except Exception as e:
             logger.error(f"[API/Stream] Agent failed: {e}")
             try:
@@ -218,21 +240,30 @@ async def run_analysis_stream(request: AnalysisRequest):
             except Exception:
                 pass
             await queue.put({"type": "error", "message": str(e)})
+            await queue.put(None)
         finally:
-            await queue.put(None)  # 哨兵：通知生成器结束
+            _history_cache.invalidate()
 
     async def _event_generator():
-        """SSE 事件生成器"""
-        task = asyncio.create_task(_run_agent_task())
-        try:
+        """SSE 事件生成器 — TaskGroup 保证生成器退出 / 被取消时 agent 任务随之取消"""
+        async with asyncio.TaskGroup() as tg:
+            task = tg.create_task(_run_agent_task())
             while True:
-                event = await queue.get()
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=_SSE_DISCONNECT_POLL_SECONDS
+                    )
+                except TimeoutError:
+                    if await http_request.is_disconnected():
+                        task.cancel()
+                        break
+                    continue
                 if event is None:
                     break
-                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
-        except asyncio.CancelledError:
-            task.cancel()
-            raise
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+                if await http_request.is_disconnected():
+                    task.cancel()
+                    break
 
     return StreamingResponse(
         _event_generator(),
@@ -245,54 +276,57 @@ async def run_analysis_stream(request: AnalysisRequest):
     )
 
 
-@router.get("/", response_model=list[AnalysisHistoryItem])
-async def list_reports(
-    limit: int = 50,
-    session: AsyncSession = Depends(get_db_session),
-):
+@router.get("/", responses={200: {"model": list[AnalysisHistoryItem]}})
+async def list_reports(limit: int = 50):
     """获取历史分析列表（从数据库读取，重启后依然保留）"""
-    repo = ReportRepository(session)
-    reports = await repo.get_recent(limit=limit)
+    items = await _history_cache.get_or_load(limit, lambda: _load_history(limit))
+    return ORJSONResponse(items)
+
+
+async def _load_history(limit: int) -> list[dict[str, Any]]:
+    """从数据库读取最近的分析记录（缓存加载在独立 task 中运行，使用独立 session）"""
+    async with get_session_factory()() as session:
+        reports = await ReportRepository(session).get_recent(limit=limit)
 
+    # 数据来自数据库，直接构造 dict 交给 orjson，跳过逐字段校验
     return [
-        AnalysisHistoryItem(
-            report_id=str(r.id),
-            query=r.query,
-            status=r.status,
-            created_at=r.created_at.isoformat() if r.created_at else "",
-            patent_summary=r.patent_summary,
-            trend_summary=r.trend_summary,
-        )
+        {
+            "report_id": str(r.id),
+            "query": r.query,
+            "status": r.status,
+            "created_at": r.created_at.isoformat() if r.created_at else "",
+            "patent_summary": r.patent_summary,
+            "trend_summary": r.trend_summary,
+        }
         for r in reports
     ]
 
 
-@router.get("/{report_id}", response_model=AnalysisResponse)
+@router.get("/{report_id}", responses={200: {"model": AnalysisResponse}})
 async def get_report(
-    report_id: str,
+    report_id: uuid.UUID,
     session: AsyncSession = Depends(get_db_session),
 ):
-    """获取单个分析报告（从数据库读取）"""
-    try:
-        rid = uuid.UUID(report_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid report_id format")
-
+    """获取单个分析报告（从数据库读取；report_id 格式由路径参数校验，非法时返回 422）"""
     repo = ReportRepository(session)
-    report = await repo.get_by_id(rid)
+    report = await repo.get_by_id(report_id)
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
     meta = report.metadata_json or {}
-    return AnalysisResponse(
-        report_id=str(report.id),
-        query=report.query,
-        status=report.status,
-        final_report=report.full_report,
-        patent_count=meta.get("patent_count", 0),
-        trend_keywords=meta.get("trend_count", 0),
-        iterations=meta.get("iteration_count", 0),
-        patent_analysis=report.patent_summary,
-        trend_analysis=report.trend_summary,
+    return ORJSONResponse(
+        {
+            "report_id": str(report.id),
+            "query": report.query,
+            "status": report.status,
+            "final_report": report.full_report,
+            "patent_count": meta.get("patent_count", 0),
+            "trend_keywords": meta.get("trend_count", 0),
+            "iterations": meta.get("iteration_count", 0),
+            "plan": None,
+            "patent_analysis": report.patent_summary,
+            "trend_analysis": report.trend_summary,
+            "error": None,
+        }
     )
@@ -7,31 +7,46 @@ from __future__ import annotations
 
 import logging
 import uuid
-from typing import Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db_session
-from app.repositories.patent_repo import PatentRepository
+from app.core.cache import redis_get_or_set
+from app.core.database import get_db_session, get_session_factory
+from app.core.responses import ORJSONResponse
+from app.repositories.patent_repo import (
+    PATENT_STATS_REDIS_KEY,
+    PatentRepository,
+    parse_patent_date,
+    patent_list_cache,
+)
+from app.services.patent_service import PatentService, get_patent_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/patents", tags=["patents"])
 
+# 统计结果 Redis 缓存时长（键与写库失效见 patent_repo.on_patents_written）
+_STATS_REDIS_TTL = 60
+
 
 class PatentItem(BaseModel):
     """单条专利数据（来自数据库）"""
 
-    id: str
+    id: uuid.UUID
     title: str
     assignee: str | None = None
     abstract: str | None = None
     patent_id: str | None = None
     publication_number: str | None = None
-    filing_date: str | None = None
-    priority_date: str | None = None
-    publication_date: str | None = None
+    filing_date: date | None = None
+    priority_date: date | None = None
+    publication_date: date | None = None
     inventor: str | None = None
     pdf_url: str | None = None
     thumbnail_url: str | None = None
@@ -41,7 +56,7 @@ class PatentItem(BaseModel):
     source: str
     category: str | None = None
     tech_points: Any = None
-    created_at: str
+    created_at: datetime
 
 
 class PatentSearchItem(BaseModel):
@@ -71,63 +86,106 @@ class PatentStatsResponse(BaseModel):
     sources: list[str]
 
 
-@router.get("/", response_model=list[PatentItem])
+@router.get("/", responses={200: {"model": list[PatentItem]}})
 async def list_patents(
     query: str | None = None,
     assignee: str | None = None,
     validity: str | None = None,
     limit: int = 0,
-    session: AsyncSession = Depends(get_db_session),
+    cursor: str | None = None,
 ):
     """
     获取专利列表（用于专利矩阵看板）
     支持按搜索关键词、申请人、专利有效性筛选
 
     - validity: ACTIVE / NOT_ACTIVE / None（不筛选）
+    - limit=0（不限条数）时以流式 JSON 数组返回，逐批序列化，不在内存中构建完整列表
+    - cursor: 键集分页游标（上一页响应头 X-Next-Cursor 的值），仅 limit>0 时生效；
+      返回满页时响应头 X-Next-Cursor 给出下一页游标（URL 安全的不透明字符串，原样回传即可）
     """
-    repo = PatentRepository(session)
-    patents = await repo.search(
-        query=query, assignee=assignee, validity=validity, limit=limit
+    if limit <= 0:
+        return StreamingResponse(
+            _stream_patents(query, assignee, validity),
+            media_type="application/json",
+        )
+    after = _parse_cursor(cursor) if cursor else None
+    patents = await patent_list_cache.get_or_load(
+        (query, assignee, validity, limit, after),
+        lambda: _load_patents(query, assignee, validity, limit, after),
     )
-
-    result = []
-    for p in patents:
-        # figures 字段：若为 JSONB list，直接用；否则尝试从 raw_data 取
-        figs = p.figures or []
-        if not figs and isinstance(p.raw_data, dict):
-            raw_figs = p.raw_data.get("figures", [])
-            figs = [
-                f["thumbnail"] if isinstance(f, dict) else str(f) for f in raw_figs if f
-            ]
-
-        result.append(
-            PatentItem(
-                id=str(p.id),
-                title=p.title,
-                assignee=p.assignee,
-                abstract=p.abstract,
-                patent_id=p.patent_id,
-                publication_number=p.publication_number,
-                filing_date=p.filing_date,
-                priority_date=p.priority_date,
-                publication_date=p.publication_date,
-                inventor=p.inventor,
-                pdf_url=p.pdf_url,
-                thumbnail_url=p.thumbnail_url,
-                figures=figs,
-                country_status=p.country_status or {},
-                search_query=p.search_query,
-                source=p.source or "serpapi",
-                category=p.category,
-                tech_points=p.tech_points,
-                created_at=p.created_at.isoformat() if p.created_at else "",
-            )
+    headers = None
+    if len(patents) == limit:
+        last = patents[-1]
+        headers = {"X-Next-Cursor": _encode_cursor(last["created_at"], last["id"])}
+    return ORJSONResponse(patents, headers=headers)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _encode_cursor(created_at: datetime, patent_uuid: uuid.UUID) -> str:
+    """生成 "<created_at 纪元微秒>_<id hex>" 形式的分页游标（仅数字 / 十六进制 / 下划线，放进查询串无需编码）"""
+    return f"{(created_at - _EPOCH) // _MICROSECOND}_{patent_uuid.hex}"
+
+
+def _parse_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """解析 _encode_cursor 生成的分页游标"""
+    micros, _, patent_uuid = cursor.partition("_")
+    try:
+        return _EPOCH + int(micros) * _MICROSECOND, uuid.UUID(hex=patent_uuid)
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _load_patents(
+    query: str | None,
+    assignee: str | None,
+    validity: str | None,
+    limit: int,
+    after: tuple[datetime, uuid.UUID] | None,
+) -> list[dict[str, Any]]:
+    """从数据库读取专利列表（PatentItem 字段字典；缓存加载在独立 task 中运行，使用独立 session）"""
+    async with get_session_factory()() as session:
+        rows = await PatentRepository(session).search_rows(
+            query=query, assignee=assignee, validity=validity, limit=limit, after=after
         )
-
-    return result
+    return [_patent_fields(r) for r in rows]
+
+
+async def _stream_patents(
+    query: str | None,
+    assignee: str | None,
+    validity: str | None,
+) -> AsyncIterator[bytes]:
+    """以 JSON 数组形式分批输出专利（使用独立 session，生命周期跟随响应流）"""
+    yield b"["
+    first = True
+    async with get_session_factory()() as session:
+        repo = PatentRepository(session)
+        async for batch in repo.stream_search_rows(
+            query=query, assignee=assignee, validity=validity
+        ):
+            # 整批一次序列化为数组再去掉首尾方括号，比逐行 dumps + join 少 N 次调用
+            body = orjson.dumps([_patent_fields(r) for r in batch])[1:-1]
+            if not body:
+                continue
+            yield body if first else b"," + body
+            first = False
+    yield b"]"
+
+
+def _patent_fields(row: RowMapping) -> dict[str, Any]:
+    """将 LIST_COLUMNS 行映射转换为 PatentItem 字段字典（UUID / datetime 交由 orjson 原生序列化）"""
+    fields = dict(row)
+    fields.update(
+        country_status=fields["country_status"] or {},
+        source=fields["source"] or "serpapi",
+    )
+    return fields
 
 
-@router.get("/search", response_model=list[PatentSearchItem])
+@router.get("/search", responses={200: {"model": list[PatentSearchItem]}})
 async def search_patents_live(
     q: str,
     countries: str | None = None,
@@ -140,6 +198,7 @@ async def search_patents_live(
     patent_type: str | None = None,
     language: str | None = None,
     session: AsyncSession = Depends(get_db_session),
+    service: PatentService = Depends(get_patent_service),
 ):
     """
     实时调用 SerpApi 进行专利搜索，同时将结果写入数据库。
@@ -153,9 +212,6 @@ async def search_patents_live(
     - patent_type: PATENT / DESIGN
     - language: ENGLISH / CHINESE / JAPANESE 等
     """
-    from app.services.patent_service import PatentService
-    from app.models.patent import Patent
-
     max_results = max(10, min(max_results, 100))
 
     country_list = (
@@ -164,7 +220,6 @@ async def search_patents_live(
         else []
     )
 
-    service = PatentService()
     raw_results = await service._search_serpapi(
         q,
         max_results=max_results,
@@ -188,49 +243,59 @@ async def search_patents_live(
         label_parts.append(f"sort:{sort}")
     search_query_label = " ".join(label_parts)[:200]
 
-    # 写入数据库（去重：跳过 patent_id 已存在的记录）
-    if raw_results:
+    # 一次遍历同时构建响应条目与数据库行
+    items: list[dict[str, Any]] = []
+    patent_rows: list[dict[str, Any]] = []
+    for r in raw_results:
+        items.append(
+            {
+                "patent_id": r.get("patent_id"),
+                "publication_number": r.get("publication_number"),
+                "title": r.get("title", ""),
+                "assignee": r.get("assignee"),
+                "inventor": r.get("inventor"),
+                "abstract": r.get("abstract"),
+                "filing_date": r.get("filing_date"),
+                "priority_date": r.get("priority_date"),
+                "publication_date": r.get("publication_date"),
+                "pdf_url": r.get("pdf_url"),
+                "thumbnail_url": r.get("thumbnail_url"),
+                "figures": r.get("figures", []),
+                "country_status": r.get("country_status", {}),
+            }
+        )
+        patent_rows.append(
+            dict(
+                title=r.get("title", "Unknown")[:500],
+                assignee=(r.get("assignee") or "")[:300] or None,
+                abstract=r.get("abstract"),
+                patent_id=(r.get("patent_id") or "")[:50] or None,
+                publication_number=(r.get("publication_number") or "")[:100] or None,
+                filing_date=parse_patent_date(r.get("filing_date")),
+                priority_date=parse_patent_date(r.get("priority_date")),
+                publication_date=parse_patent_date(r.get("publication_date")),
+                inventor=(r.get("inventor") or "")[:500] or None,
+                pdf_url=r.get("pdf_url") or None,
+                thumbnail_url=r.get("thumbnail_url") or None,
+                figures=r.get("figures") or [],
+                country_status=r.get("country_status") or {},
+                search_query=search_query_label,
+                source="serpapi",
+                raw_data=r,
+            )
+        )
+
+    # 写入数据库（去重：同一查询词下 patent_id 已存在的记录由 ON CONFLICT DO NOTHING 跳过）
+    if patent_rows:
         try:
             repo = PatentRepository(session)
+            saved = await repo.copy_insert_ignore_duplicates(patent_rows)
 
-            # 提取本批所有 patent_id，查询数据库中已存在的
-            incoming_ids = [(r.get("patent_id") or "")[:50] for r in raw_results]
-            existing_ids = await repo.find_existing_patent_ids(incoming_ids)
-
-            # 仅保留数据库中不存在的新专利
-            new_results = [
-                r
-                for r in raw_results
-                if (r.get("patent_id") or "")[:50] not in existing_ids
-            ]
-
-            if new_results:
-                patent_records = [
-                    Patent(
-                        title=r.get("title", "Unknown")[:500],
-                        assignee=(r.get("assignee") or "")[:300] or None,
-                        abstract=r.get("abstract"),
-                        patent_id=(r.get("patent_id") or "")[:50] or None,
-                        publication_number=(r.get("publication_number") or "")[:100]
-                        or None,
-                        filing_date=(r.get("filing_date") or "")[:30] or None,
-                        priority_date=(r.get("priority_date") or "")[:30] or None,
-                        publication_date=(r.get("publication_date") or "")[:30] or None,
-                        inventor=(r.get("inventor") or "")[:500] or None,
-                        pdf_url=r.get("pdf_url") or None,
-                        thumbnail_url=r.get("thumbnail_url") or None,
-                        figures=r.get("figures") or [],
-                        country_status=r.get("country_status") or {},
-                        search_query=search_query_label,
-                        source="serpapi",
-                        raw_data=r,
-                    )
-                    for r in new_results
-                ]
-                await repo.bulk_create(patent_records)
+            if saved:
+                await repo.on_patents_written()
                 logger.info(
-                    f"[/api/patents/search] Saved {len(patent_records)} new patents "
-                    f"(skipped {len(existing_ids)} duplicates) "
+                    f"[/api/patents/search] Saved {saved} new patents "
+                    f"(skipped {len(patent_rows) - saved} duplicates) "
                     f"for query='{search_query_label}'"
                 )
             else:
@@ -241,55 +306,26 @@ async def search_patents_live(
         except Exception as e:
             logger.warning(f"[/api/patents/search] DB save failed: {e}")
 
-    return [
-        PatentSearchItem(
-            patent_id=r.get("patent_id"),
-            publication_number=r.get("publication_number"),
-            title=r.get("title", ""),
-            assignee=r.get("assignee"),
-            inventor=r.get("inventor"),
-            abstract=r.get("abstract"),
-            filing_date=r.get("filing_date"),
-            priority_date=r.get("priority_date"),
-            publication_date=r.get("publication_date"),
-            pdf_url=r.get("pdf_url"),
-            thumbnail_url=r.get("thumbnail_url"),
-            figures=r.get("figures", []),
-            country_status=r.get("country_status", {}),
-        )
-        for r in raw_results
-    ]
+    return ORJSONResponse(items)
 
 
-@router.get("/stats", response_model=PatentStatsResponse)
-async def get_patent_stats(
-    session: AsyncSession = Depends(get_db_session),
-):
-    """获取专利库统计数据（总数、申请人列表、查询词列表）"""
-    from sqlalchemy import select, func as sqlfunc
-    from app.models.patent import Patent
-
-    # 总数
-    total_res = await session.execute(select(sqlfunc.count()).select_from(Patent))
-    total = total_res.scalar() or 0
+@router.get("/stats", responses={200: {"model": PatentStatsResponse}})
+async def get_patent_stats(exact: bool = False):
+    """
+    获取专利库统计数据（总数、申请人列表、查询词列表）
 
-    # 申请人列表（去重，排除 None）
-    assignee_res = await session.execute(
-        select(Patent.assignee).where(Patent.assignee.is_not(None)).distinct().limit(50)
+    - exact: 总数默认为 PostgreSQL 统计估算值，exact=true 时精确计数
+    """
+    body = await redis_get_or_set(
+        PATENT_STATS_REDIS_KEY.format(exact=exact),
+        _STATS_REDIS_TTL,
+        lambda: _load_patent_stats(exact),
     )
-    assignees = [r[0] for r in assignee_res.fetchall() if r[0]]
+    # 缓存的是已序列化字节，直接透传
+    return Response(content=body, media_type="application/json")
 
-    # 查询词列表（去重）
-    query_res = await session.execute(select(Patent.search_query).distinct().limit(30))
-    queries = [r[0] for r in query_res.fetchall() if r[0]]
 
-    # 来源列表
-    source_res = await session.execute(select(Patent.source).distinct())
-    sources = [r[0] for r in source_res.fetchall() if r[0]]
-
-    return PatentStatsResponse(
-        total=total,
-        assignees=assignees,
-        queries=queries,
-        sources=sources,
-    )
+async def _load_patent_stats(exact: bool) -> bytes:
+    """读取专利统计物化视图（由写库路径刷新）并序列化"""
+    async with get_session_factory()() as session:
+        return orjson.dumps(await PatentRepository(session).get_stats(exact=exact))
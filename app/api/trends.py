@@ -5,18 +5,30 @@ FastAPI 路由 — 趋势数据端点
 from __future__ import annotations
 
 import logging
+from datetime import datetime
 from typing import Any
 
+import orjson
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import Response
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import redis_get_or_set
 from app.core.database import get_db_session
+from app.core.responses import ORJSONResponse
+from app.models.trend import TrendSummary
 from app.repositories.trend_repo import TrendRepository
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/trends", tags=["trends"])
 
+# 查询词下拉列表在 Redis 中以 orjson 字节缓存
+_QUERIES_REDIS_KEY = "stats:trend_queries:v1"
+_QUERIES_REDIS_TTL = 60
+
 
 class TrendDataPoint(BaseModel):
     """单条趋势时序数据"""
@@ -37,10 +49,10 @@ class TrendSummaryItem(BaseModel):
     ending_value: float | None = None
     source: str
     timeframe_months: int | None = None
-    created_at: str
+    created_at: datetime
 
 
-@router.get("/data", response_model=list[TrendDataPoint])
+@router.get("/data", responses={200: {"model": list[TrendDataPoint]}})
 async def get_trend_data(
     search_query: str | None = None,
     keyword: str | None = None,
@@ -51,32 +63,16 @@ async def get_trend_data(
     支持按查询词、关键词筛选
     """
     repo = TrendRepository(session)
+    # 未指定查询词则返回所有（限制 500 条）
+    rows = await repo.list_data_rows(
+        search_query=search_query,
+        keyword=keyword,
+        limit=None if search_query else 500,
+    )
+    return ORJSONResponse([dict(r) for r in rows])
 
-    if search_query and keyword:
-        records = await repo.get_data_by_keyword(keyword, search_query)
-    elif search_query:
-        records = await repo.get_data_by_query(search_query)
-    else:
-        # 未指定则返回所有（限制 500 条）
-        from sqlalchemy import select
-        from app.models.trend import TrendData
-        stmt = select(TrendData).order_by(TrendData.date.asc()).limit(500)
-        result = await session.execute(stmt)
-        records = result.scalars().all()
-
-    return [
-        TrendDataPoint(
-            keyword=r.keyword,
-            date=r.date,
-            value=r.value,
-            source=r.source or "pytrends",
-            search_query=r.search_query,
-        )
-        for r in records
-    ]
-
-
-@router.get("/summaries", response_model=list[TrendSummaryItem])
+
+@router.get("/summaries", responses={200: {"model": list[TrendSummaryItem]}})
 async def get_trend_summaries(
     search_query: str | None = None,
     limit: int = 20,
@@ -86,9 +82,6 @@ async def get_trend_summaries(
     获取趋势摘要（CAGR 榜单），按 CAGR 降序排列
     用于「高潜力增长词汇榜单」
     """
-    from sqlalchemy import select
-    from app.models.trend import TrendSummary
-
     stmt = select(TrendSummary)
     if search_query:
         stmt = stmt.where(TrendSummary.search_query == search_query)
@@ -96,31 +89,32 @@ async def get_trend_summaries(
     result = await session.execute(stmt)
     summaries = result.scalars().all()
 
-    return [
-        TrendSummaryItem(
-            keyword=s.keyword,
-            search_query=s.search_query,
-            cagr=s.cagr,
-            cmgr=s.cmgr,
-            beginning_value=s.beginning_value,
-            ending_value=s.ending_value,
-            source=s.source or "pytrends",
-            timeframe_months=s.timeframe_months,
-            created_at=s.created_at.isoformat() if s.created_at else "",
-        )
-        for s in summaries
-    ]
-
-
-@router.get("/queries", response_model=list[str])
+    return ORJSONResponse(
+        [
+            {
+                "keyword": s.keyword,
+                "search_query": s.search_query,
+                "cagr": s.cagr,
+                "cmgr": s.cmgr,
+                "beginning_value": s.beginning_value,
+                "ending_value": s.ending_value,
+                "source": s.source or "pytrends",
+                "timeframe_months": s.timeframe_months,
+                "created_at": s.created_at,
+            }
+            for s in summaries
+        ]
+    )
+
+
+@router.get("/queries", responses={200: {"model": list[str]}})
 async def get_distinct_queries(
     session: AsyncSession = Depends(get_db_session),
 ):
     """获取所有已分析过的查询词（去重），供下拉框使用"""
-    from sqlalchemy import select
-    from app.models.trend import TrendSummary
+    async def _load() -> bytes:
+        repo = TrendRepository(session)
+        return orjson.dumps(await repo.get_distinct_queries(limit=30))
 
-    result = await session.execute(
-        select(TrendSummary.search_query).distinct().limit(30)
-    )
-    return [r[0] for r in result.fetchall() if r[0]]
+    body = await redis_get_or_set(_QUERIES_REDIS_KEY, _QUERIES_REDIS_TTL, _load)
+    return Response(content=body, media_type="application/json")
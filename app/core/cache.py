@@ -0,0 +1,112 @@
+"""
+缓存工具
+- AsyncTTLCache: 进程内异步 TTL 缓存（容量上限 LRU 淘汰 + 同 key 并发请求合并）
+- redis_get_or_set: 跨 worker 共享的 Redis 字节缓存，Redis 不可用时直接回源
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def _consume_task_result(task: asyncio.Task) -> None:
+    """取走加载 task 的异常，避免所有等待者都已取消时出现未取回异常的告警"""
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncTTLCache:
+    """带过期时间和并发合并的异步缓存，供高频轮询的只读端点使用"""
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        # 每次 invalidate 递增，失效前发起的加载结果不再写入缓存
+        self._generation = 0
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        命中未过期缓存直接返回；否则合并到进行中的加载，或发起新的加载
+
+        loader 可能在发起请求结束后继续运行，不得使用请求级资源（如依赖注入的 session）。
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                return value
+            del self._data[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            # 加载在独立 task 中运行：任一等待者被取消（如客户端断开）不影响其他合并的请求
+            task = asyncio.create_task(self._load(key, loader, self._generation))
+            task.add_done_callback(_consume_task_result)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int
+    ) -> Any:
+        """执行加载并写入缓存（失效前发起的加载结果不写入）"""
+        try:
+            value = await loader()
+        finally:
+            self._inflight.pop(key, None)
+
+        if generation == self._generation:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def invalidate(self) -> None:
+        """清空缓存（数据写入后调用）"""
+        self._data.clear()
+        self._generation += 1
+
+
+async def redis_get_or_set(
+    key: str, ttl: int, loader: Callable[[], Awaitable[bytes]]
+) -> bytes:
+    """读取 Redis 中已序列化的响应字节；未命中时调用 loader 并写回（失败不影响主流程）"""
+    redis = None
+    try:
+        redis = await get_redis()
+        cached = await redis.get(key)
+        if cached is not None:
+            # 连接池开启了 decode_responses，取回的是 str
+            return cached.encode() if isinstance(cached, str) else cached
+    except Exception as e:
+        logger.debug(f"Redis cache read skipped for {key}: {e}")
+        redis = None
+
+    value = await loader()
+    if redis is not None:
+        try:
+            await redis.set(key, value, ex=ttl)
+        except Exception as e:
+            logger.debug(f"Redis cache write skipped for {key}: {e}")
+    return value
+
+
+async def redis_delete(*keys: str) -> None:
+    """删除 Redis 缓存 key（写库后失效用，失败仅记录日志）"""
+    try:
+        redis = await get_redis()
+        await redis.delete(*keys)
+    except Exception as e:
+        logger.debug(f"Redis cache delete skipped for {keys}: {e}")
@@ -5,29 +5,66 @@ PostgreSQL 数据库连接管理
 """
 from __future__ import annotations
 
+import asyncio
+
+import orjson
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import get_settings
 
+# 每个连接缓存的预编译语句数（asyncpg 默认 100），常用查询免去重复解析与生成计划
+_STATEMENT_CACHE_SIZE = 1024
+# 常驻连接数：多个 Agent 并发运行时，各节点同时写库，池子需足够大避免排队取连接
+_POOL_SIZE = 20
+# 启动建表 / 升级 DDL 的 advisory lock key：多 worker 同时启动时串行执行
+_INIT_DB_LOCK_KEY = 0x636F6D70
+
 # 异步引擎 — 延迟初始化
 _engine = None
 _async_session_factory = None
 
 
+def _json_serializer(value) -> str:
+    """JSON / JSONB 列写入时使用 orjson 编码（asyncpg 方言要求 str）"""
+    return orjson.dumps(value).decode()
+
+
 def get_engine():
     """获取或创建异步数据库引擎"""
     global _engine
     if _engine is None:
         settings = get_settings()
+        if settings.database_pgbouncer:
+            # PgBouncer 事务池模式下连接会被复用给其他客户端，预编译语句不可跨事务保留
+            connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        else:
+            connect_args = {
+                "statement_cache_size": _STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": _STATEMENT_CACHE_SIZE,
+            }
         _engine = create_async_engine(
             settings.database_url,
-            echo=settings.debug,
-            pool_size=10,
-            max_overflow=20,
+            echo=settings.database_echo,
+            connect_args=connect_args,
+            # asyncio 兼容的队列池（异步引擎默认值，显式声明避免误配同步 QueuePool）
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=_POOL_SIZE,
+            max_overflow=40,
+            # 取出连接前探活，避免数据库重启后拿到失效连接
+            pool_pre_ping=True,
+            # 定期回收长连接，避免被数据库 / 中间代理的空闲超时静默断开
+            pool_recycle=1800,
+            # executemany 批量 INSERT 合并为多行 VALUES 的每页行数
+            insertmanyvalues_page_size=1000,
+            # JSONB 列（raw_data 等，单行可达数十 KB）用 orjson 编解码替代标准库 json
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
         )
     return _engine
 
@@ -44,6 +81,17 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
     return _async_session_factory
 
 
+async def warm_up_pool() -> None:
+    """启动时并发建立常驻连接，避免首批请求承担建连与认证开销"""
+    engine = get_engine()
+
+    async def _connect() -> None:
+        async with engine.connect():
+            pass
+
+    await asyncio.gather(*(_connect() for _ in range(_POOL_SIZE)))
+
+
 async def get_db_session() -> AsyncSession:
     """FastAPI 依赖注入: 获取数据库会话"""
     factory = get_session_factory()
@@ -51,12 +99,42 @@ async def get_db_session() -> AsyncSession:
         yield session
 
 
+async def get_driver_connection(session: AsyncSession):
+    """取出 session 当前事务所用的底层 asyncpg 连接（COPY 等驱动级 API 使用）"""
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection
+
+
+async def copy_records(
+    session: AsyncSession,
+    table: str,
+    columns: tuple[str, ...] | list[str],
+    records: list[tuple],
+) -> int:
+    """
+    经 PostgreSQL COPY (二进制协议) 批量写入元组记录，绕过逐行参数化 INSERT
+
+    JSONB 列需由调用方预先编码为 JSON 文本；不提交事务，由调用方 commit。
+    返回写入行数。
+    """
+    driver_conn = await get_driver_connection(session)
+    await driver_conn.copy_records_to_table(
+        table, records=records, columns=list(columns)
+    )
+    return len(records)
+
+
 async def init_db():
     """初始化数据库 — 创建所有表 (开发环境用)"""
     from app.models.base import Base
 
     engine = get_engine()
     async with engine.begin() as conn:
+        # 事务级锁，提交后自动释放；其他 worker 在此等待，随后各 DDL 因 IF [NOT] EXISTS 跳过
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": _INIT_DB_LOCK_KEY}
+        )
         await conn.run_sync(Base.metadata.create_all)
 
 
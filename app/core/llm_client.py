@@ -0,0 +1,45 @@
+"""
+LLM 客户端管理
+- 进程内共享单个 ChatOpenAI 实例及其 httpx 连接池
+- 供 LLMService 等调用方使用，应用关闭时释放连接
+"""
+from __future__ import annotations
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from app.core.config import get_settings, get_yaml_config
+
+# 与 OpenAI SDK 默认一致：长文本生成允许较长读超时，建连快速失败
+_LLM_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+_LLM_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+_chat_model: ChatOpenAI | None = None
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_chat_model() -> ChatOpenAI:
+    """获取或创建共享的 ChatOpenAI 实例（同步创建，协程间不存在初始化竞争）"""
+    global _chat_model, _http_client
+    if _chat_model is None:
+        settings = get_settings()
+        llm_config = get_yaml_config().llm
+        _http_client = httpx.AsyncClient(timeout=_LLM_TIMEOUT, limits=_LLM_LIMITS)
+        _chat_model = ChatOpenAI(
+            model=settings.llm_model or "gpt-4o-mini",
+            api_key=settings.llm_api_key or "sk-placeholder",
+            base_url=settings.llm_api_base or None,
+            temperature=llm_config.temperature,
+            max_tokens=llm_config.max_tokens,
+            http_async_client=_http_client,
+        )
+    return _chat_model
+
+
+async def close_chat_model():
+    """关闭 LLM 客户端连接池"""
+    global _chat_model, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _chat_model = None
+    _http_client = None
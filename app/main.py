@@ -23,6 +23,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class OriginCORSMiddleware(CORSMiddleware):
+    """仅对携带 Origin 头的浏览器跨域请求执行 CORS 处理，服务端直连请求直接放行"""
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and not any(
+            name == b"origin" for name, _ in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 # ---- 生命周期管理 ----
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -30,13 +42,17 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     logger.info(f"Starting {settings.app_name} ({settings.app_env})")
 
-    # 启动: 初始化数据库
+    # 启动: 初始化数据库（建表失败不影响连接池预热）
+    from app.core.database import init_db, warm_up_pool
     try:
-        from app.core.database import init_db
         await init_db()
         logger.info("Database initialized")
     except Exception as e:
         logger.warning(f"Database init skipped: {e}")
+    try:
+        await warm_up_pool()
+    except Exception as e:
+        logger.warning(f"Database pool warm-up skipped: {e}")
 
     # 启动: 初始化 Redis
     try:
@@ -51,7 +67,13 @@ async def lifespan(app: FastAPI):
     # 关闭: 清理资源
     try:
         from app.core.database import close_db
+        from app.core.llm_client import close_chat_model
         from app.core.redis import close_redis
+        from app.services.patent_service import get_patent_service
+        from app.services.trend_service import get_trend_service
+        await get_patent_service().aclose()
+        await get_trend_service().aclose()
+        await close_chat_model()
         await close_db()
         await close_redis()
         logger.info("Resources cleaned up")
@@ -69,11 +91,13 @@ app = FastAPI(
 
 # ---- CORS 中间件 ----
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
+    OriginCORSMiddleware,
+    allow_origins=get_settings().cors_allow_origins,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    # 专利列表键集分页游标，前端需可读
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ---- 挂载路由 ----
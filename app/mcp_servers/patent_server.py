@@ -25,9 +25,9 @@ async def search_patents(query: str, max_results: int = 50) -> dict:
     Returns:
         包含专利列表的字典，每篇专利包含 title, assignee, abstract, filing_date 等字段
     """
-    from app.services.patent_service import PatentService
+    from app.services.patent_service import get_patent_service
 
-    service = PatentService()
+    service = get_patent_service()
     patents = await service.search_patents(query, max_results)
 
     return {
@@ -51,9 +51,9 @@ async def analyze_patent_landscape(query: str, patents_data: list[dict]) -> dict
     Returns:
         包含技术分析和分类的字典
     """
-    from app.services.llm_service import LLMService
+    from app.services.llm_service import get_llm_service
 
-    llm_service = LLMService()
+    llm_service = get_llm_service()
     result = await llm_service.analyze_patents(patents_data, query)
 
     return result
@@ -1,9 +1,38 @@
 """
 SQLAlchemy 声明式基类
 """
+from typing import Any, Iterable
+
+from sqlalchemy import Table, event, inspect
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateIndex
 
 
 class Base(DeclarativeBase):
     """所有 ORM 模型的基类"""
-    pass
+
+    def to_insert_row(self) -> dict[str, Any]:
+        """导出已赋值的列（供 Core INSERT 批量写入）；未赋值的列交由列默认值 / 服务端默认值填充"""
+        return {
+            attr.key: value
+            for attr in inspect(self).mapper.column_attrs
+            if (value := getattr(self, attr.key)) is not None
+        }
+
+
+def ensure_indexes(table: Table, names: Iterable[str] | None = None) -> None:
+    """
+    为已有库补建索引：create_all 不会给已存在的表添加索引，
+    注册 after_create 钩子，每次启动以 CREATE INDEX IF NOT EXISTS 补齐（新库上为空操作）
+
+    names 为 None 时处理表上全部非唯一索引；唯一索引可能因历史重复数据建失败，需单独迁移。
+    """
+    wanted = None if names is None else set(names)
+    for index in sorted(table.indexes, key=lambda i: i.name):
+        if index.unique or (wanted is not None and index.name not in wanted):
+            continue
+        event.listen(
+            Base.metadata,
+            "after_create",
+            CreateIndex(index, if_not_exists=True).execute_if(dialect="postgresql"),
+        )
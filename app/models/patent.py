@@ -5,18 +5,58 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import DDL, Date, DateTime, Index, String, Text, event, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.models.base import Base
+from app.models.base import Base, ensure_indexes
+
+# 专利统计物化视图名（单行：去重后的申请人 / 查询词 / 来源；总数读 pg_class 估算值）
+# 视图定义变更时递增版本号，启动时按新名字创建，无需 DROP 正在使用的旧视图
+PATENT_STATS_VIEW = "patent_stats_mv_v1"
 
 
 class Patent(Base):
     """专利数据表"""
     __tablename__ = "patents"
+    __table_args__ = (
+        # 申请人模糊匹配 (ILIKE '%x%') 无法使用 B-tree，使用 pg_trgm 三元组 GIN 索引
+        Index(
+            "ix_patents_assignee_trgm",
+            "assignee",
+            postgresql_using="gin",
+            postgresql_ops={"assignee": "gin_trgm_ops"},
+        ),
+        # 统计视图按「松散索引扫描」逐个跳取去重申请人，需要 B-tree
+        Index(
+            "ix_patents_assignee",
+            "assignee",
+            postgresql_where=text("assignee IS NOT NULL"),
+        ),
+        # 有效性筛选 (country_status @@ '$.* == "ACTIVE"')：默认 jsonb_ops 才支持 .* 通配访问
+        Index(
+            "ix_patents_country_status_gin",
+            "country_status",
+            postgresql_using="gin",
+        ),
+        # 按查询词筛选并按创建时间倒序分页：索引顺序即结果顺序，LIMIT 无需排序
+        # （前导列 search_query 同时服务统计视图的松散索引扫描）
+        Index(
+            "ix_patents_search_query_created_at",
+            "search_query",
+            text("created_at DESC"),
+        ),
+        # 写库去重 (ON CONFLICT DO NOTHING)：同一查询词下同一专利只存一份，
+        # 不同查询词可各自收录同一专利；patent_id 为 NULL 的行互不冲突
+        Index(
+            "ux_patents_query_patent_id",
+            "search_query",
+            "patent_id",
+            unique=True,
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -27,16 +67,16 @@ class Patent(Base):
     assignee: Mapped[str | None] = mapped_column(String(300), nullable=True)
     # 摘要 / snippet
     abstract: Mapped[str | None] = mapped_column(Text, nullable=True)
-    # 专利号 (patent_id)
+    # 专利号 (patent_id)，与 search_query 组成部分唯一索引用于写库去重
     patent_id: Mapped[str | None] = mapped_column(String(50), nullable=True, index=True)
     # 公开号 (publication_number)
     publication_number: Mapped[str | None] = mapped_column(String(100), nullable=True)
-    # 申请日期
-    filing_date: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    # 申请日期（写库前由 parse_patent_date 解析，无法解析的存 NULL）
+    filing_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     # 优先权日
-    priority_date: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    priority_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     # 公开日
-    publication_date: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    publication_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     # 发明人
     inventor: Mapped[str | None] = mapped_column(String(500), nullable=True)
     # PDF 原文链接
@@ -48,9 +88,9 @@ class Patent(Base):
     # 各国有效性状态 (JSON map)
     country_status: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     # 搜索关键词 (关联到哪个查询)
-    search_query: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    search_query: Mapped[str] = mapped_column(String(200), nullable=False)
     # 数据来源: serpapi | uspto
-    source: Mapped[str] = mapped_column(String(20), default="serpapi")
+    source: Mapped[str] = mapped_column(String(20), default="serpapi", index=True)
     # LLM 提取的核心技术点 (JSON 数组)
     tech_points: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     # 竞品分类
@@ -64,3 +104,154 @@ class Patent(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+# gin_trgm_ops 依赖 pg_trgm 扩展，需在建表前启用
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# 已有库升级：create_all 不会修改已存在的表，以下幂等 DDL 在每次启动时补齐结构
+# patent_id 由全局唯一改为按查询词唯一：旧的唯一索引降为普通索引，
+# 补建 (search_query, patent_id) 唯一索引前先清理历史重复行（保留最早写入的一条）
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = 'ix_patents_patent_id' AND i.indisunique
+            ) THEN
+                DROP INDEX ix_patents_patent_id;
+                CREATE INDEX ix_patents_patent_id ON patents (patent_id);
+            END IF;
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_class WHERE relname = 'ux_patents_query_patent_id'
+            ) THEN
+                DELETE FROM patents p USING patents d
+                WHERE p.search_query = d.search_query
+                  AND p.patent_id = d.patent_id
+                  AND (p.created_at, p.id) > (d.created_at, d.id);
+                CREATE UNIQUE INDEX ux_patents_query_patent_id
+                    ON patents (search_query, patent_id);
+            END IF;
+        END
+        $$
+        """
+    ).execute_if(dialect="postgresql"),
+)
+
+# 日期列由 VARCHAR(30) 改为 DATE：能识别的 YYYY-MM-DD... / YYYYMMDD 转换，其余置 NULL
+# 转换函数建在会话临时 schema 中（连接关闭即消失）；不存在的日期（如 2023-02-30）返回 NULL
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        """
+        CREATE OR REPLACE FUNCTION pg_temp.patent_date_or_null(v text) RETURNS date
+        LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            IF v ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}' THEN
+                RETURN left(v, 10)::date;
+            ELSIF v ~ '^[0-9]{8}$' THEN
+                RETURN to_date(v, 'YYYYMMDD');
+            END IF;
+            RETURN NULL;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$
+        """
+    ).execute_if(dialect="postgresql"),
+)
+for _date_column in ("filing_date", "priority_date", "publication_date"):
+    # 单列转换失败只告警，不回滚同一启动事务中的其他迁移
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(
+            f"""
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'patents' AND column_name = '{_date_column}'
+                      AND data_type = 'character varying'
+                ) THEN
+                    -- DDL 语句会做百分号格式化，RAISE 占位符需写成两个百分号
+                    BEGIN
+                        ALTER TABLE patents ALTER COLUMN {_date_column} TYPE date
+                            USING pg_temp.patent_date_or_null({_date_column});
+                    EXCEPTION WHEN others THEN
+                        RAISE WARNING 'patents.{_date_column} date migration failed: %%', SQLERRM;
+                    END;
+                END IF;
+            END
+            $$
+            """
+        ).execute_if(dialect="postgresql"),
+    )
+
+# 已有库补建全部非唯一索引（trgm / GIN / 复合索引等）；
+# 统计视图的松散索引扫描依赖 assignee / source 上的 B-tree，需在建视图前补齐
+ensure_indexes(Patent.__table__)
+
+# 专利统计物化视图 — 写库后 REFRESH，统计端点只读一行
+# 去重列表用递归 CTE 做松散索引扫描：每步从 B-tree 取下一个更大的值，取够条数即停止，
+# 不做全表 DISTINCT 聚合
+# 已存在则跳过（多 worker 同时启动不会互相 DROP / CREATE）；唯一索引是 REFRESH ... CONCURRENTLY 的前提
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {PATENT_STATS_VIEW} AS
+        WITH RECURSIVE
+            a AS (
+                SELECT min(assignee) AS v FROM patents WHERE assignee <> ''
+                UNION ALL
+                SELECT (SELECT min(assignee) FROM patents WHERE assignee > a.v)
+                FROM a WHERE a.v IS NOT NULL
+            ),
+            q AS (
+                SELECT min(search_query) AS v FROM patents WHERE search_query <> ''
+                UNION ALL
+                SELECT (SELECT min(search_query) FROM patents WHERE search_query > q.v)
+                FROM q WHERE q.v IS NOT NULL
+            ),
+            s AS (
+                SELECT min(source) AS v FROM patents WHERE source <> ''
+                UNION ALL
+                SELECT (SELECT min(source) FROM patents WHERE source > s.v)
+                FROM s WHERE s.v IS NOT NULL
+            )
+        SELECT
+            1 AS id,
+            coalesce(
+                (SELECT array_agg(v) FROM (SELECT v FROM a WHERE v IS NOT NULL LIMIT 50) t),
+                '{{}}'
+            ) AS assignees,
+            coalesce(
+                (SELECT array_agg(v) FROM (SELECT v FROM q WHERE v IS NOT NULL LIMIT 30) t),
+                '{{}}'
+            ) AS queries,
+            coalesce(
+                (SELECT array_agg(v) FROM s WHERE v IS NOT NULL),
+                '{{}}'
+            ) AS sources
+        """
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{PATENT_STATS_VIEW}_id "
+        f"ON {PATENT_STATS_VIEW} (id)"
+    ).execute_if(dialect="postgresql"),
+)
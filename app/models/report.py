@@ -7,22 +7,33 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Integer, String, Text, func
+from sqlalchemy import DateTime, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.models.base import Base
+from app.models.base import Base, ensure_indexes
 
 
 class AnalysisReport(Base):
     """分析报告表"""
     __tablename__ = "analysis_reports"
+    __table_args__ = (
+        # 历史报告列表 / 按查询词取报告均按创建时间倒序，索引顺序即结果顺序
+        Index("ix_analysis_reports_created_at", text("created_at DESC")),
+        Index("ix_analysis_reports_query_created_at", "query", text("created_at DESC")),
+        # 未结束的报告（恢复 / 清理扫描用）：部分索引只覆盖进行中的少量行
+        Index(
+            "ix_analysis_reports_active",
+            "created_at",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     # 查询关键词
-    query: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    query: Mapped[str] = mapped_column(String(200), nullable=False)
     # 专利分析摘要
     patent_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     # 趋势分析摘要
@@ -42,3 +53,7 @@ class AnalysisReport(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+
+# 已有库升级：create_all 不会给已存在的表添加索引，启动时补建
+ensure_indexes(AnalysisReport.__table__)
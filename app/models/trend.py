@@ -7,16 +7,20 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, String, Text, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.models.base import Base
+from app.models.base import Base, ensure_indexes
 
 
 class TrendData(Base):
     """趋势数据表"""
     __tablename__ = "trend_data"
+    __table_args__ = (
+        # 按查询词（及关键词）取时序并按日期排序：索引顺序即结果顺序，无需排序
+        Index("ix_trend_data_query_keyword_date", "search_query", "keyword", "date"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -30,7 +34,7 @@ class TrendData(Base):
     # 数据来源: pytrends | rainforest | keepa
     source: Mapped[str] = mapped_column(String(20), default="pytrends")
     # 搜索查询 (关联到哪个分析任务)
-    search_query: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
+    search_query: Mapped[str] = mapped_column(String(200), nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -62,3 +66,8 @@ class TrendSummary(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+
+
+# 已有库升级：create_all 不会给已存在的表添加索引，启动时补建
+ensure_indexes(TrendData.__table__)
+ensure_indexes(TrendSummary.__table__)
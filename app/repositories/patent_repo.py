@@ -5,13 +5,100 @@
 
 from __future__ import annotations
 
+import logging
 import uuid
-from typing import Sequence
+from datetime import date, datetime
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select, delete, text
+import orjson
+from sqlalchemy import RowMapping, func, literal_column, select, delete, text, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
-from app.models.patent import Patent
+from app.core.cache import AsyncTTLCache, redis_delete
+from app.core.database import copy_records, get_driver_connection
+from app.models.patent import PATENT_STATS_VIEW, Patent
+
+logger = logging.getLogger(__name__)
+
+# 看板高频轮询的专利列表缓存与 Redis 统计缓存（orjson 字节，跨 worker 共享）；
+# 任何写库路径完成后经 on_patents_written 统一失效
+patent_list_cache = AsyncTTLCache(ttl=30, maxsize=64)
+PATENT_STATS_REDIS_KEY = "stats:patents:v1:{exact}"
+
+# 行数达到该阈值时经 COPY → 临时表 → INSERT ... SELECT 写入，低于阈值直接多行 INSERT
+_COPY_MIN_ROWS = 50
+# JSONB 列：COPY 时需预先编码为 JSON 文本
+_JSONB_COLUMNS = frozenset(
+    c.name for c in Patent.__table__.columns if isinstance(c.type, JSONB)
+)
+
+
+def parse_patent_date(value: str | date | None) -> date | None:
+    """解析数据源返回的日期（YYYY-MM-DD / YYYYMMDD / ISO 时间戳），无法解析时返回 None"""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    text_value = str(value).strip()
+    try:
+        if len(text_value) == 8 and text_value.isdigit():
+            return date(int(text_value[:4]), int(text_value[4:6]), int(text_value[6:]))
+        return date.fromisoformat(text_value[:10])
+    except ValueError:
+        return None
+
+
+# 写库去重的冲突目标：对应唯一索引 ux_patents_query_patent_id
+# （非部分索引：唯一索引本就允许多个 NULL，冲突子句无需重复谓词）
+_CONFLICT_COLUMNS = (Patent.search_query, Patent.patent_id)
+_CONFLICT_SQL = "ON CONFLICT (search_query, patent_id) DO NOTHING"
+
+# 列表类 ORM 查询默认不加载 raw_data（单行可达数十 KB）；误访问时直接报错而非触发异步懒加载
+_DEFER_RAW_DATA = defer(Patent.raw_data, raiseload=True)
+
+# figures 为空时回退到 raw_data.figures[*].thumbnail，由 PostgreSQL 直接产出字符串数组
+_EMPTY_JSONB_ARRAY = literal_column("'[]'::jsonb")
+FIGURES_COLUMN = func.coalesce(
+    func.nullif(Patent.figures, _EMPTY_JSONB_ARRAY),
+    func.jsonb_path_query_array(
+        Patent.raw_data, literal_column("'$.figures[*].thumbnail'::jsonpath")
+    ),
+    _EMPTY_JSONB_ARRAY,
+).label("figures")
+
+# 列表接口所需列；不加载整个 raw_data JSONB 原始数据
+LIST_COLUMNS = (
+    Patent.id,
+    Patent.title,
+    Patent.assignee,
+    Patent.abstract,
+    Patent.patent_id,
+    Patent.publication_number,
+    Patent.filing_date,
+    Patent.priority_date,
+    Patent.publication_date,
+    Patent.inventor,
+    Patent.pdf_url,
+    Patent.thumbnail_url,
+    FIGURES_COLUMN,
+    Patent.country_status,
+    Patent.search_query,
+    Patent.source,
+    Patent.category,
+    Patent.tech_points,
+    Patent.created_at,
+)
+
+# 卡片式列表所需的最少列（不含任何 JSONB 列）
+CARD_COLUMNS = (
+    Patent.id,
+    Patent.title,
+    Patent.assignee,
+    Patent.patent_id,
+    Patent.filing_date,
+)
 
 
 class PatentRepository:
@@ -20,18 +107,74 @@ class PatentRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create(self, patent: Patent) -> Patent:
-        """创建专利记录"""
+    async def create(self, patent: Patent, refresh: bool = False) -> Patent:
+        """创建专利记录（id 由客户端生成；需要读取服务端默认列时传 refresh=True）"""
         self.session.add(patent)
         await self.session.commit()
-        await self.session.refresh(patent)
+        if refresh:
+            await self.session.refresh(patent)
         return patent
 
-    async def bulk_create(self, patents: list[Patent]) -> list[Patent]:
-        """批量创建专利记录"""
-        self.session.add_all(patents)
+    async def insert_ignore_duplicates(self, rows: list[dict]) -> int:
+        """
+        批量插入专利行，同一查询词下 patent_id 已存在的行由数据库跳过
+
+        INSERT ... ON CONFLICT (search_query, patent_id) DO NOTHING，一次往返完成去重与写入，
+        无需先查询已存在的 patent_id。返回实际插入行数。
+        """
+        if not rows:
+            return 0
+        stmt = (
+            pg_insert(Patent)
+            .values(rows)
+            .on_conflict_do_nothing(
+                index_elements=_CONFLICT_COLUMNS
+            )
+            .returning(Patent.id)
+        )
+        result = await self.session.execute(stmt)
+        inserted = len(result.fetchall())
+        await self.session.commit()
+        return inserted
+
+    async def copy_insert_ignore_duplicates(self, rows: list[dict]) -> int:
+        """
+        大批量写入专利行，同一查询词下 patent_id 已存在的行由数据库跳过
+
+        先以 COPY 写入事务级临时表，再 INSERT ... SELECT ... ON CONFLICT DO NOTHING
+        合并进 patents 表；行数不足 _COPY_MIN_ROWS 时退回 insert_ignore_duplicates。
+        rows 的 key 需一致（以 Patent 列名为 key）。返回实际插入行数。
+        """
+        if len(rows) < _COPY_MIN_ROWS:
+            return await self.insert_ignore_duplicates(rows)
+
+        columns = ["id", *rows[0]]
+        records = [
+            (
+                uuid.uuid4(),
+                *(
+                    orjson.dumps(row[c]).decode() if c in _JSONB_COLUMNS else row[c]
+                    for c in columns[1:]
+                ),
+            )
+            for row in rows
+        ]
+        column_list = ", ".join(columns)
+
+        raw = await get_driver_connection(self.session)
+        async with raw.transaction():
+            await raw.execute(
+                "CREATE TEMP TABLE tmp_patents_copy "
+                "(LIKE patents INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            await copy_records(self.session, "tmp_patents_copy", columns, records)
+            inserted = await raw.fetch(
+                f"INSERT INTO patents ({column_list}) "
+                f"SELECT {column_list} FROM tmp_patents_copy "
+                f"{_CONFLICT_SQL} RETURNING id"
+            )
         await self.session.commit()
-        return patents
+        return len(inserted)
 
     async def get_by_id(self, patent_id: uuid.UUID) -> Patent | None:
         """根据 ID 获取专利"""
@@ -41,22 +184,68 @@ class PatentRepository:
         """根据搜索关键词获取专利列表"""
         stmt = (
             select(Patent)
+            .options(_DEFER_RAW_DATA)
             .where(Patent.search_query == search_query)
             .order_by(Patent.created_at.desc())
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def list_by_query(self, search_query: str) -> Sequence[RowMapping]:
+        """按搜索关键词获取 CARD_COLUMNS 投影（不加载 JSONB 列）；需要完整字段时用 get_by_query"""
+        stmt = (
+            select(*CARD_COLUMNS)
+            .where(Patent.search_query == search_query)
+            .order_by(Patent.created_at.desc())
+        )
+        result = await self.session.execute(stmt)
+        return result.mappings().all()
+
+    async def iter_by_query(
+        self, search_query: str, chunk: int = 500
+    ) -> AsyncIterator[Patent]:
+        """get_by_query 的服务端游标版本，按 chunk 分批拉取，适合导出等大结果集场景"""
+        stmt = (
+            select(Patent)
+            .options(_DEFER_RAW_DATA)
+            .where(Patent.search_query == search_query)
+            .order_by(Patent.created_at.desc())
+            .execution_options(yield_per=chunk)
+        )
+        result = await self.session.stream_scalars(stmt)
+        async for patent in result:
+            yield patent
+
     async def get_by_assignee(self, assignee: str) -> Sequence[Patent]:
         """根据申请人查询"""
         stmt = (
             select(Patent)
+            .options(_DEFER_RAW_DATA)
             .where(Patent.assignee.ilike(f"%{assignee}%"))
             .order_by(Patent.created_at.desc())
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def get_by_country_status(
+        self, country: str, status: str, limit: int = 50
+    ) -> Sequence[Patent]:
+        """
+        查询在指定国家处于指定状态的专利（如 country="US", status="ACTIVE"）
+
+        使用 JSONB 包含运算 country_status @> {"US": "ACTIVE"}，可走 country_status 的 GIN 索引；
+        ->> 取值再比较的写法无法使用该索引
+        """
+        stmt = (
+            select(Patent)
+            .options(_DEFER_RAW_DATA)
+            .where(Patent.country_status.contains({country: status}))
+            .order_by(Patent.created_at.desc(), Patent.id.desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
     async def search(
         self,
         query: str | None = None,
@@ -70,7 +259,67 @@ class PatentRepository:
         validity: "ACTIVE" / "NOT_ACTIVE" / None（不筛选）
             基于 country_status JSONB 字段，检查是否有任一国家状态匹配
         """
-        stmt = select(Patent)
+        stmt = self._search_stmt(
+            select(Patent).options(_DEFER_RAW_DATA),
+            query,
+            assignee,
+            category,
+            validity,
+            limit,
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def search_rows(
+        self,
+        query: str | None = None,
+        assignee: str | None = None,
+        category: str | None = None,
+        validity: str | None = None,
+        limit: int = 50,
+        after: tuple[datetime, uuid.UUID] | None = None,
+    ) -> Sequence[RowMapping]:
+        """
+        多条件搜索，返回 LIST_COLUMNS 的轻量行映射（不构建 ORM 对象）
+
+        after: 键集分页游标 (created_at, id)，只返回排在该行之后的记录，
+            无需 OFFSET 扫描并丢弃前面的行
+        """
+        stmt = self._search_stmt(
+            select(*LIST_COLUMNS), query, assignee, category, validity, limit
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Patent.created_at, Patent.id) < after)
+        result = await self.session.execute(stmt)
+        return result.mappings().all()
+
+    async def stream_search_rows(
+        self,
+        query: str | None = None,
+        assignee: str | None = None,
+        category: str | None = None,
+        validity: str | None = None,
+        limit: int = 0,
+        batch_size: int = 200,
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """search_rows 的服务端游标版本，按 batch_size 分批产出，避免一次性加载全部结果"""
+        stmt = self._search_stmt(
+            select(*LIST_COLUMNS), query, assignee, category, validity, limit
+        ).execution_options(yield_per=batch_size)
+        result = await self.session.stream(stmt)
+        async for batch in result.mappings().partitions():
+            yield batch
+
+    @staticmethod
+    def _search_stmt(
+        stmt,
+        query: str | None,
+        assignee: str | None,
+        category: str | None,
+        validity: str | None,
+        limit: int,
+    ):
+        """为查询语句附加多条件筛选、排序与条数限制"""
         if query:
             stmt = stmt.where(Patent.search_query == query)
         if assignee:
@@ -78,18 +327,17 @@ class PatentRepository:
         if category:
             stmt = stmt.where(Patent.category == category)
         if validity in ("ACTIVE", "NOT_ACTIVE"):
-            # 使用 PostgreSQL jsonb_each_text 检查是否有任一国家状态匹配
+            # 任一国家状态匹配即命中；jsonpath 谓词可走 country_status 的 GIN 索引
             stmt = stmt.where(
-                text(
-                    "EXISTS (SELECT 1 FROM jsonb_each_text(patents.country_status) AS x "
-                    f"WHERE x.value = '{validity}')"
+                Patent.country_status.op("@@")(
+                    literal_column(f"'$.* == \"{validity}\"'::jsonpath")
                 )
             )
-        stmt = stmt.order_by(Patent.created_at.desc())
+        # id 作为同一时间戳下的次序，保证键集分页顺序稳定
+        stmt = stmt.order_by(Patent.created_at.desc(), Patent.id.desc())
         if limit > 0:
             stmt = stmt.limit(limit)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return stmt
 
     async def find_existing_patent_ids(self, patent_ids: list[str]) -> set[str]:
         """
@@ -103,8 +351,59 @@ class PatentRepository:
         if not clean_ids:
             return set()
         stmt = select(Patent.patent_id).where(Patent.patent_id.in_(clean_ids))
-        result = await self.session.execute(stmt)
-        return {row[0] for row in result.fetchall() if row[0]}
+        result = await self.session.scalars(stmt)
+        return set(filter(None, result))
+
+    async def get_stats(self, exact: bool = False) -> dict:
+        """
+        读取专利统计物化视图（单行）
+
+        总数默认取 pg_class.reltuples 估算值（O(1) 目录查询，无需全表扫描）；
+        表从未 ANALYZE（reltuples <= 0）或 exact=True 时回退到 count(*)。
+        """
+        total_sql = (
+            "(SELECT count(*) FROM patents)"
+            if exact
+            else (
+                "(SELECT CASE WHEN reltuples > 0 THEN reltuples::bigint "
+                "ELSE (SELECT count(*) FROM patents) END "
+                "FROM pg_class WHERE oid = 'patents'::regclass)"
+            )
+        )
+        result = await self.session.execute(
+            text(
+                f"SELECT {total_sql} AS total, assignees, queries, sources "
+                f"FROM {PATENT_STATS_VIEW}"
+            )
+        )
+        row = result.mappings().first()
+        if row is None:
+            return {"total": 0, "assignees": [], "queries": [], "sources": []}
+        return dict(row)
+
+    async def refresh_stats(self) -> None:
+        """写库后刷新专利统计物化视图（CONCURRENTLY 不阻塞并发读取）"""
+        await self.session.execute(
+            text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {PATENT_STATS_VIEW}")
+        )
+        await self.session.commit()
+
+    async def on_patents_written(self) -> None:
+        """
+        专利写库后的统一收尾（Agent 节点与 /search 共用）：刷新统计视图并失效读缓存
+
+        写入已提交，视图刷新失败只记录日志，缓存仍然失效（刷新后再删 Redis，避免刷新期间回填旧统计）。
+        """
+        try:
+            await self.refresh_stats()
+        except Exception as e:
+            await self.session.rollback()
+            logger.warning(f"Patent stats view refresh failed: {e}")
+        patent_list_cache.invalidate()
+        await redis_delete(
+            PATENT_STATS_REDIS_KEY.format(exact=False),
+            PATENT_STATS_REDIS_KEY.format(exact=True),
+        )
 
     async def delete_by_query(self, search_query: str) -> int:
         """删除某次查询的所有专利记录"""
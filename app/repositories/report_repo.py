@@ -19,11 +19,14 @@ class ReportRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create(self, report: AnalysisReport) -> AnalysisReport:
-        """创建报告（初始状态为 pending）"""
+    async def create(
+        self, report: AnalysisReport, refresh: bool = False
+    ) -> AnalysisReport:
+        """创建报告（初始状态为 pending；id 由客户端生成，需要读取服务端默认列时传 refresh=True）"""
         self.session.add(report)
         await self.session.commit()
-        await self.session.refresh(report)
+        if refresh:
+            await self.session.refresh(report)
         return report
 
     async def get_by_id(self, report_id: uuid.UUID) -> AnalysisReport | None:
@@ -50,6 +53,17 @@ class ReportRepository:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def get_active(self, limit: int = 100) -> Sequence[AnalysisReport]:
+        """获取尚未结束（pending / running）的报告，按创建时间升序（走部分索引）"""
+        stmt = (
+            select(AnalysisReport)
+            .where(AnalysisReport.status.in_(("pending", "running")))
+            .order_by(AnalysisReport.created_at.asc())
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
     async def update_status(
         self, report_id: uuid.UUID, status: str, **kwargs
     ) -> None:
@@ -5,13 +5,37 @@
 from __future__ import annotations
 
 import uuid
-from typing import Sequence
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select, delete
+from sqlalchemy import RowMapping, func, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import copy_records
 from app.models.trend import TrendData, TrendSummary
 
+# COPY 写入的列顺序（id 由调用方生成；created_at 使用服务端默认值）
+TREND_DATA_COPY_COLUMNS = ("id", "keyword", "date", "value", "source", "search_query")
+TREND_SUMMARY_COPY_COLUMNS = (
+    "id",
+    "keyword",
+    "search_query",
+    "cagr",
+    "cmgr",
+    "beginning_value",
+    "ending_value",
+    "source",
+    "timeframe_months",
+)
+
+# 折线图接口所需列；source 为空时由数据库补默认值
+TREND_DATA_LIST_COLUMNS = (
+    TrendData.keyword,
+    TrendData.date,
+    TrendData.value,
+    func.coalesce(TrendData.source, "pytrends").label("source"),
+    TrendData.search_query,
+)
+
 
 class TrendRepository:
     """趋势数据仓库"""
@@ -21,11 +45,20 @@ class TrendRepository:
 
     # --- TrendData ---
     async def bulk_create_data(self, records: list[TrendData]) -> list[TrendData]:
-        """批量插入趋势时序数据"""
-        self.session.add_all(records)
-        await self.session.commit()
+        """批量插入趋势时序数据（Core INSERT executemany，跳过 unit-of-work）"""
+        await self._insert_objects(TrendData, records)
         return records
 
+    async def copy_data(self, records: list[tuple]) -> int:
+        """通过 PostgreSQL COPY 批量写入趋势时序数据（元组顺序同 TREND_DATA_COPY_COLUMNS）"""
+        return await self._copy_records(
+            TrendData.__tablename__, TREND_DATA_COPY_COLUMNS, records
+        )
+
+    async def insert_data(self, records: list[tuple]) -> int:
+        """Core INSERT 批量写入趋势时序数据（元组顺序同 TREND_DATA_COPY_COLUMNS），适合小批量"""
+        return await self._insert_records(TrendData, TREND_DATA_COPY_COLUMNS, records)
+
     async def get_data_by_keyword(
         self, keyword: str, search_query: str
     ) -> Sequence[TrendData]:
@@ -51,22 +84,74 @@ class TrendRepository:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def iter_data_by_query(
+        self, search_query: str, chunk: int = 500
+    ) -> AsyncIterator[TrendData]:
+        """get_data_by_query 的服务端游标版本，按 chunk 分批拉取"""
+        stmt = (
+            select(TrendData)
+            .where(TrendData.search_query == search_query)
+            .order_by(TrendData.keyword, TrendData.date.asc())
+            .execution_options(yield_per=chunk)
+        )
+        result = await self.session.stream_scalars(stmt)
+        async for record in result:
+            yield record
+
+    async def list_data_rows(
+        self,
+        search_query: str | None = None,
+        keyword: str | None = None,
+        limit: int | None = None,
+    ) -> Sequence[RowMapping]:
+        """
+        按查询 / 关键词获取趋势数据，返回 TREND_DATA_LIST_COLUMNS 的行映射（不构建 ORM 对象）
+
+        排序与 get_data_by_query / get_data_by_keyword 一致；未指定查询时按日期升序
+        """
+        stmt = select(*TREND_DATA_LIST_COLUMNS)
+        if search_query:
+            stmt = stmt.where(TrendData.search_query == search_query)
+            if keyword:
+                stmt = stmt.where(TrendData.keyword == keyword)
+            else:
+                stmt = stmt.order_by(TrendData.keyword)
+        stmt = stmt.order_by(TrendData.date.asc())
+        if limit:
+            stmt = stmt.limit(limit)
+        result = await self.session.execute(stmt)
+        return result.mappings().all()
+
     # --- TrendSummary ---
-    async def create_summary(self, summary: TrendSummary) -> TrendSummary:
-        """创建趋势摘要"""
+    async def create_summary(
+        self, summary: TrendSummary, refresh: bool = False
+    ) -> TrendSummary:
+        """创建趋势摘要（id 由客户端生成；需要读取服务端默认列时传 refresh=True）"""
         self.session.add(summary)
         await self.session.commit()
-        await self.session.refresh(summary)
+        if refresh:
+            await self.session.refresh(summary)
         return summary
 
     async def bulk_create_summaries(
         self, summaries: list[TrendSummary]
     ) -> list[TrendSummary]:
-        """批量创建趋势摘要"""
-        self.session.add_all(summaries)
-        await self.session.commit()
+        """批量创建趋势摘要（Core INSERT executemany，跳过 unit-of-work）"""
+        await self._insert_objects(TrendSummary, summaries)
         return summaries
 
+    async def copy_summaries(self, records: list[tuple]) -> int:
+        """通过 PostgreSQL COPY 批量写入趋势摘要（元组顺序同 TREND_SUMMARY_COPY_COLUMNS）"""
+        return await self._copy_records(
+            TrendSummary.__tablename__, TREND_SUMMARY_COPY_COLUMNS, records
+        )
+
+    async def insert_summaries(self, records: list[tuple]) -> int:
+        """Core INSERT 批量写入趋势摘要（元组顺序同 TREND_SUMMARY_COPY_COLUMNS），适合小批量"""
+        return await self._insert_records(
+            TrendSummary, TREND_SUMMARY_COPY_COLUMNS, records
+        )
+
     async def get_summaries_by_query(
         self, search_query: str
     ) -> Sequence[TrendSummary]:
@@ -79,11 +164,74 @@ class TrendRepository:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def get_distinct_queries(self, limit: int = 30) -> list[str]:
+        """
+        获取去重后的查询词（松散索引扫描）
+
+        递归 CTE 每步沿 search_query 索引跳到下一个更大的值，取满 limit 个即停止，
+        避免 SELECT DISTINCT 对全表做哈希聚合。
+        """
+        result = await self.session.execute(
+            text(
+                """
+                WITH RECURSIVE q AS (
+                    SELECT min(search_query) AS v
+                    FROM trend_summaries WHERE search_query <> ''
+                    UNION ALL
+                    SELECT (
+                        SELECT min(search_query) FROM trend_summaries
+                        WHERE search_query > q.v
+                    )
+                    FROM q WHERE q.v IS NOT NULL
+                )
+                SELECT v FROM q WHERE v IS NOT NULL LIMIT :limit
+                """
+            ),
+            {"limit": limit},
+        )
+        return list(result.scalars())
+
     async def delete_by_query(self, search_query: str) -> int:
-        """删除某次查询的所有趋势数据"""
-        stmt1 = delete(TrendData).where(TrendData.search_query == search_query)
-        stmt2 = delete(TrendSummary).where(TrendSummary.search_query == search_query)
-        r1 = await self.session.execute(stmt1)
-        r2 = await self.session.execute(stmt2)
+        """删除某次查询的所有趋势数据（时序数据与摘要在同一条语句中删除，一次往返）"""
+        result = await self.session.execute(
+            text(
+                f"WITH d1 AS (DELETE FROM {TrendData.__tablename__} "
+                "WHERE search_query = :q RETURNING 1), "
+                f"d2 AS (DELETE FROM {TrendSummary.__tablename__} "
+                "WHERE search_query = :q RETURNING 1) "
+                "SELECT (SELECT count(*) FROM d1) + (SELECT count(*) FROM d2)"
+            ),
+            {"q": search_query},
+        )
+        deleted = result.scalar_one()
+        await self.session.commit()
+        return deleted
+
+    async def _copy_records(
+        self, table: str, columns: tuple[str, ...], records: list[tuple]
+    ) -> int:
+        """COPY 批量写入并提交"""
+        copied = await copy_records(self.session, table, columns, records)
+        await self.session.commit()
+        return copied
+
+    async def _insert_objects(self, model, objects: list) -> None:
+        """ORM 对象导出为列字典后一次 executemany；id 在客户端生成，对象无需 refresh"""
+        if not objects:
+            return
+        for obj in objects:
+            obj.id = obj.id or uuid.uuid4()
+        await self.session.execute(
+            insert(model), [obj.to_insert_row() for obj in objects]
+        )
+        await self.session.commit()
+
+    async def _insert_records(
+        self, model, columns: tuple[str, ...], records: list[tuple]
+    ) -> int:
+        """元组按列名组装为参数字典后一次 executemany，跳过 ORM 对象构建"""
+        await self.session.execute(
+            insert(model), [dict(zip(columns, r)) for r in records]
+        )
         await self.session.commit()
-        return r1.rowcount + r2.rowcount
+        return len(records)
@@ -1,6 +1,15 @@
-from app.services.patent_service import PatentService
-from app.services.trend_service import TrendService
-from app.services.llm_service import LLMService
-from app.services.memory_service import MemoryService
+from app.services.patent_service import PatentService, get_patent_service
+from app.services.trend_service import TrendService, get_trend_service
+from app.services.llm_service import LLMService, get_llm_service
+from app.services.memory_service import MemoryService, get_memory_service
 
-__all__ = ["PatentService", "TrendService", "LLMService", "MemoryService"]
+__all__ = [
+    "PatentService",
+    "TrendService",
+    "LLMService",
+    "MemoryService",
+    "get_patent_service",
+    "get_trend_service",
+    "get_llm_service",
+    "get_memory_service",
+]
@@ -4,74 +4,29 @@ LLM 服务封装 (LLM Service)
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from typing import Any
+import re
+from functools import lru_cache
+from typing import Any, AsyncIterator
 
+import orjson
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
 from app.core.config import get_settings, get_yaml_config
+from app.core.llm_client import get_chat_model
+from app.core.redis import get_redis
 
 logger = logging.getLogger(__name__)
 
+# LLM 响应缓存的 Redis key 前缀
+_CACHE_KEY_PREFIX = "llm:cache:v1:"
 
-class LLMService:
-    """LLM 调用封装 — 兼容 OpenAI 格式的平台"""
-
-    def __init__(self):
-        self.settings = get_settings()
-        self.yaml_config = get_yaml_config()
-        self._llm: ChatOpenAI | None = None
-
-    @property
-    def llm(self) -> ChatOpenAI:
-        """懒加载 LLM 实例"""
-        if self._llm is None:
-            self._llm = ChatOpenAI(
-                model=self.settings.llm_model or "gpt-4o-mini",
-                api_key=self.settings.llm_api_key or "sk-placeholder",
-                base_url=self.settings.llm_api_base or None,
-                temperature=self.yaml_config.llm.temperature,
-                max_tokens=self.yaml_config.llm.max_tokens,
-            )
-        return self._llm
-
-    async def chat(self, messages: list[dict[str, str]]) -> str:
-        """
-        通用对话调用
-        messages: [{"role": "system", "content": "..."}, {"role": "user", "content": "..."}]
-        """
-        try:
-            from langchain_core.messages import HumanMessage, SystemMessage
-
-            lc_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    lc_messages.append(SystemMessage(content=msg["content"]))
-                else:
-                    lc_messages.append(HumanMessage(content=msg["content"]))
-
-            response = await self.llm.ainvoke(lc_messages)
-            return response.content
-
-        except Exception as e:
-            logger.error(f"LLM chat failed: {e}")
-            return f"[LLM Error] {str(e)}"
-
-    async def analyze_patents(
-        self, patents_data: list[dict], query: str
-    ) -> dict[str, Any]:
-        """
-        分析专利数据 — 提取核心技术点 + 竞品分类
-        返回: {"tech_analysis": str, "categories": dict}
-        """
-        patents_text = "\n".join(
-            [
-                f"- Title: {p.get('title', '')}\n  Assignee: {p.get('assignee', '')}\n  Abstract: {p.get('abstract', '')[:200]}"
-                for p in patents_data[:30]
-            ]
-        )
-
-        prompt = f"""你是一位专利分析专家。请分析以下与 "{query}" 相关的专利数据：
+# ---- Prompt 模板（模块加载时构建一次，调用时 format_map 填充变量）----
+_ANALYZE_SYSTEM_PROMPT = "你是专利分析专家，总是以 JSON 格式回复。"
+_ANALYZE_PROMPT_TMPL = """你是一位专利分析专家。请分析以下与 "{query}" 相关的专利数据：
 
 {patents_text}
 
@@ -87,25 +42,12 @@ class LLMService:
 - barriers: 列表，主要的专利壁垒描述
 - summary: 总体分析摘要
 """
-        result = await self.chat(
-            [
-                {"role": "system", "content": "你是专利分析专家，总是以 JSON 格式回复。"},
-                {"role": "user", "content": prompt},
-            ]
-        )
-
-        return {"tech_analysis": result, "query": query}
+# 参与分析的专利条数上限及摘要截断长度
+_ANALYZE_MAX_PATENTS = 30
+_ANALYZE_ABSTRACT_CHARS = 200
 
-    async def generate_report(
-        self,
-        patent_analysis: str,
-        trend_data: str,
-        extra_context: str = "",
-    ) -> str:
-        """
-        生成窗口期预警简报 — Markdown 格式
-        """
-        prompt = f"""你是一位市场策略分析师。基于以下数据，生成一份《窗口期预警简报》。
+_REPORT_SYSTEM_PROMPT = "你是资深市场策略分析师，擅长撰写专业的市场分析报告，以 Markdown 格式输出。"
+_REPORT_PROMPT_TMPL = """你是一位市场策略分析师。基于以下数据，生成一份《窗口期预警简报》。
 
 ## 专利壁垒分析
 {patent_analysis}
@@ -114,7 +56,7 @@ class LLMService:
 {trend_data}
 
 ## 外部补充信息
-{extra_context or "无额外信息"}
+{extra_context}
 
 请输出一份 Markdown 格式的深度分析报告，包含：
 
@@ -127,22 +69,14 @@ class LLMService:
 
 报告需要专业、数据驱动、有说服力。
 """
-        return await self.chat(
-            [
-                {
-                    "role": "system",
-                    "content": "你是资深市场策略分析师，擅长撰写专业的市场分析报告，以 Markdown 格式输出。",
-                },
-                {"role": "user", "content": prompt},
-            ]
-        )
 
-    async def review_report(self, report: str) -> dict[str, Any]:
-        """
-        审核报告质量 — Node_Review 使用
-        返回: {"passed": bool, "feedback": str}
-        """
-        prompt = f"""请审核以下市场分析报告的质量：
+# 审核回复中的 JSON 对象（可能包裹在 ```json 代码块或说明文字中）
+_REVIEW_JSON_RE = re.compile(r"\{.*\}", re.S)
+# JSON 解析失败时的兜底匹配
+_REVIEW_PASSED_RE = re.compile(r'"passed"\s*:\s*true', re.I)
+
+_REVIEW_SYSTEM_PROMPT = "你是报告质量审核专家，始终以 JSON 格式回复。"
+_REVIEW_PROMPT_TMPL = """请审核以下市场分析报告的质量：
 
 {report}
 
@@ -159,28 +93,253 @@ class LLMService:
 - score: 1-10 整体质量评分
 - feedback: 改进建议（如果 passed=false）
 """
+
+_SUMMARY_SYSTEM_PROMPT = "你是信息压缩专家，请输出简短摘要。"
+# 固定指令在前、上下文在后，便于服务端 prompt 前缀缓存命中
+_SUMMARY_PROMPT_TMPL = """请将以下对话/分析上下文压缩为简洁的摘要（不超过 200 字）。
+摘要需保留：关键查询词、主要结论、重要数据点。
+
+{context}
+"""
+
+
+class LLMService:
+    """LLM 调用封装 — 兼容 OpenAI 格式的平台"""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.yaml_config = get_yaml_config()
+
+    @property
+    def llm(self) -> ChatOpenAI:
+        """进程内共享的 ChatOpenAI 实例（见 app.core.llm_client）"""
+        return get_chat_model()
+
+    async def chat(
+        self, messages: list[dict[str, str]], use_cache: bool = True
+    ) -> str:
+        """
+        通用对话调用
+        messages: [{"role": "system", "content": "..."}, {"role": "user", "content": "..."}]
+        use_cache: 是否走响应缓存；报告生成 / 审核等需要每次重新采样的调用应传 False
+
+        可在同一实例上并发调用（不修改实例状态，ChatOpenAI 客户端并发安全），
+        互不依赖的 LLM 调用应以 asyncio.gather 并发发起
+        """
+        cache_key = self._cache_key(messages) if use_cache else None
+        cached = await self._cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            logger.info(f"LLM cache HIT, tokens_saved≈{len(cached) // 4}")
+            return cached
+
+        try:
+            response = await self.llm.ainvoke(self._to_lc_messages(messages))
+            content = response.content
+
+        except Exception as e:
+            logger.error(f"LLM chat failed: {e}")
+            return f"[LLM Error] {str(e)}"
+
+        if cache_key:
+            await self._cache_set(cache_key, content)
+        return content
+
+    async def chat_stream(
+        self, messages: list[dict[str, str]], use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        流式对话调用 — 逐块产出文本
+        调用方可提前中断（aclose），中断的响应不写入缓存
+        """
+        cache_key = self._cache_key(messages) if use_cache else None
+        cached = await self._cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            logger.info(f"LLM cache HIT, tokens_saved≈{len(cached) // 4}")
+            yield cached
+            return
+
+        parts: list[str] = []
+        try:
+            async for chunk in self.llm.astream(self._to_lc_messages(messages)):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        except Exception as e:
+            logger.error(f"LLM stream failed: {e}")
+            if not parts:
+                yield f"[LLM Error] {str(e)}"
+            return
+
+        if cache_key:
+            await self._cache_set(cache_key, "".join(parts))
+
+    @staticmethod
+    def _to_lc_messages(messages: list[dict[str, str]]) -> list:
+        """将 dict 消息转换为 LangChain 消息对象"""
+        lc_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                lc_messages.append(SystemMessage(content=msg["content"]))
+            else:
+                lc_messages.append(HumanMessage(content=msg["content"]))
+        return lc_messages
+
+    # ------------------------------------------------------------------
+    # 响应缓存（Redis，按 prompt 内容哈希）
+    # ------------------------------------------------------------------
+    def _cache_key(self, messages: list[dict[str, str]]) -> str:
+        """模型名 + 温度 + 消息内容 的 SHA256 作为缓存 key"""
+        payload = json.dumps(
+            {
+                "model": self.settings.llm_model,
+                "temperature": self.yaml_config.llm.temperature,
+                "messages": messages,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return _CACHE_KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _cache_get(self, key: str) -> str | None:
+        """读取缓存；未启用或 Redis 不可用时返回 None"""
+        if self.yaml_config.llm.cache_ttl_seconds <= 0:
+            return None
+        try:
+            redis = await get_redis()
+            return await redis.get(key)
+        except Exception as e:
+            logger.debug(f"LLM cache read skipped: {e}")
+            return None
+
+    async def _cache_set(self, key: str, content: str) -> None:
+        """写入缓存；失败不影响主流程"""
+        ttl = self.yaml_config.llm.cache_ttl_seconds
+        if ttl <= 0 or not isinstance(content, str) or not content:
+            return
+        try:
+            redis = await get_redis()
+            await redis.set(key, content, ex=ttl)
+        except Exception as e:
+            logger.debug(f"LLM cache write skipped: {e}")
+
+    async def analyze_patents(
+        self, patents_data: list[dict], query: str
+    ) -> dict[str, Any]:
+        """
+        分析专利数据 — 提取核心技术点 + 竞品分类
+        返回: {"tech_analysis": str, "categories": dict}
+        """
+        patents_text = "\n".join(
+            f"- Title: {p.get('title', '')}\n"
+            f"  Assignee: {p.get('assignee', '')}\n"
+            f"  Abstract: {(p.get('abstract') or '')[:_ANALYZE_ABSTRACT_CHARS]}"
+            for p in patents_data[:_ANALYZE_MAX_PATENTS]
+        )
         result = await self.chat(
             [
-                {"role": "system", "content": "你是报告质量审核专家，始终以 JSON 格式回复。"},
-                {"role": "user", "content": prompt},
+                {"role": "system", "content": _ANALYZE_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": _ANALYZE_PROMPT_TMPL.format_map(
+                        {"query": query, "patents_text": patents_text}
+                    ),
+                },
             ]
         )
 
-        # 简单解析：如果包含 "passed": true 则通过
-        passed = '"passed": true' in result.lower() or '"passed":true' in result.lower()
-        return {"passed": passed, "feedback": result}
+        return {"tech_analysis": result, "query": query}
 
-    async def summarize_for_memory(self, context: str) -> str:
-        """为 Mem0 记忆存储生成摘要"""
-        prompt = f"""请将以下对话/分析上下文压缩为简洁的摘要（不超过 200 字）：
+    async def generate_report(
+        self,
+        patent_analysis: str,
+        trend_data: str,
+        extra_context: str = "",
+    ) -> str:
+        """
+        生成窗口期预警简报 — Markdown 格式
+        不走响应缓存：审核打回后重写需要得到不同的草稿
+        """
+        return await self.chat(
+            self._report_messages(patent_analysis, trend_data, extra_context),
+            use_cache=False,
+        )
 
-{context}
+    def stream_report(
+        self,
+        patent_analysis: str,
+        trend_data: str,
+        extra_context: str = "",
+    ) -> AsyncIterator[str]:
+        """流式生成窗口期预警简报 — 供 Node_Synthesize 边生成边做结构检查"""
+        return self.chat_stream(
+            self._report_messages(patent_analysis, trend_data, extra_context),
+            use_cache=False,
+        )
 
-摘要需保留：关键查询词、主要结论、重要数据点。
-"""
+    @staticmethod
+    def _report_messages(
+        patent_analysis: str,
+        trend_data: str,
+        extra_context: str = "",
+    ) -> list[dict[str, str]]:
+        """构建窗口期预警简报的 prompt 消息"""
+        prompt = _REPORT_PROMPT_TMPL.format_map(
+            {
+                "patent_analysis": patent_analysis,
+                "trend_data": trend_data,
+                "extra_context": extra_context or "无额外信息",
+            }
+        )
+        return [
+            {"role": "system", "content": _REPORT_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    async def review_report(self, report: str) -> dict[str, Any]:
+        """
+        审核报告质量 — Node_Review 使用（不走响应缓存，每份草稿重新审核）
+        返回: {"passed": bool, "feedback": str}
+        """
+        result = await self.chat(
+            [
+                {"role": "system", "content": _REVIEW_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": _REVIEW_PROMPT_TMPL.format_map({"report": report}),
+                },
+            ],
+            use_cache=False,
+        )
+
+        return {"passed": self._parse_review_passed(result), "feedback": result}
+
+    @staticmethod
+    def _parse_review_passed(result: str) -> bool:
+        """解析审核回复中的 passed 字段；回复不是合法 JSON 时回退为正则匹配"""
+        match = _REVIEW_JSON_RE.search(result)
+        if match:
+            try:
+                data = orjson.loads(match.group(0))
+                if isinstance(data, dict):
+                    return data.get("passed") is True
+            except orjson.JSONDecodeError:
+                pass
+        return _REVIEW_PASSED_RE.search(result) is not None
+
+    async def summarize_for_memory(self, context: str) -> str:
+        """为 Mem0 记忆存储生成摘要"""
         return await self.chat(
             [
-                {"role": "system", "content": "你是信息压缩专家，请输出简短摘要。"},
-                {"role": "user", "content": prompt},
+                {"role": "system", "content": _SUMMARY_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": _SUMMARY_PROMPT_TMPL.format_map({"context": context}),
+                },
             ]
         )
+
+
+@lru_cache(maxsize=1)
+def get_llm_service() -> LLMService:
+    """获取进程内共享的 LLMService 单例（复用 ChatOpenAI 客户端及其连接池）"""
+    return LLMService()
@@ -13,14 +13,53 @@
 """
 from __future__ import annotations
 
+import asyncio
+import itertools
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
+from app.core.cache import AsyncTTLCache
 from app.core.config import get_settings, get_yaml_config
 
 logger = logging.getLogger(__name__)
 
+# 远期记忆阈值（天）：超过则压缩为短摘要
+_LONG_TERM_DAYS = 30
+
+# Mem0 SDK 为同步阻塞调用，放到线程池执行；信号量限制同时占用的线程数
+_MEM0_CONCURRENCY = 16
+_mem0_semaphore = asyncio.Semaphore(_MEM0_CONCURRENCY)
+
+# 检索缓存代数表最多跟踪的用户数（LRU 淘汰）
+_SEARCH_GENERATIONS_MAX_SIZE = 1024
+
+# Ollama 通道不可用告警框（模块加载时拼好，告警时只做格式化）
+_OLLAMA_UNAVAILABLE_BANNER = (
+    "\n"
+    "╔══════════════════════════════════════════════════════════╗\n"
+    "║        ⚠️  Mem0 本地通道 (Ollama) 不可用                 ║\n"
+    "╠══════════════════════════════════════════════════════════╣\n"
+    "║  原因: {reason:<52}║\n"
+    "║  修复: {fix:<52}║\n"
+    "╠══════════════════════════════════════════════════════════╣\n"
+    "║  系统已自动降级为内存字典 (FallbackMemory)               ║\n"
+    "║  本次会话记忆在程序重启后将不会保留                      ║\n"
+    "╚══════════════════════════════════════════════════════════╝"
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp(timestamp_str: str) -> datetime | None:
+    """解析记忆元数据中的 ISO 时间戳（同一字符串只解析一次），无法解析时返回 None"""
+    try:
+        return datetime.fromisoformat(timestamp_str)
+    except (ValueError, TypeError):
+        return None
+
 
 # ============================================================
 # 工厂函数：根据 config 构建 mem0 实例
@@ -29,21 +68,33 @@ logger = logging.getLogger(__name__)
 def _build_ollama_mem0(mem_cfg, collection: str = "compliance_agent_memory"):
     """
     构建本地通道 mem0 实例
-    向量存储: Qdrant (localhost)
+    向量存储: Qdrant (localhost，可选 gRPC 传输)
     LLM:      Ollama llama3.1
     Embedder: Ollama nomic-embed-text
     """
     from mem0 import Memory
 
+    vector_store_config = {
+        "collection_name": collection,
+        "host": mem_cfg.qdrant_host,
+        "port": mem_cfg.qdrant_port,
+        "embedding_model_dims": mem_cfg.ollama_embed_dims,
+    }
+    if mem_cfg.qdrant_prefer_grpc:
+        # mem0 的 Qdrant 配置不透传 prefer_grpc，显式构建客户端后传入
+        from qdrant_client import QdrantClient
+
+        vector_store_config["client"] = QdrantClient(
+            host=mem_cfg.qdrant_host,
+            port=mem_cfg.qdrant_port,
+            grpc_port=mem_cfg.qdrant_grpc_port,
+            prefer_grpc=True,
+        )
+
     config = {
         "vector_store": {
             "provider": "qdrant",
-            "config": {
-                "collection_name": collection,
-                "host": mem_cfg.qdrant_host,
-                "port": mem_cfg.qdrant_port,
-                "embedding_model_dims": mem_cfg.ollama_embed_dims,
-            },
+            "config": vector_store_config,
         },
         "llm": {
             "provider": "ollama",
@@ -123,8 +174,21 @@ class MemoryService:
     def __init__(self):
         self.settings = get_settings()
         self.yaml_config = get_yaml_config()
+        # 记忆衰减参数在进程内不变，初始化时取一次
+        mem_cfg = self.yaml_config.memory
+        self._short_max = mem_cfg.short_term_max_length
+        self._long_max = mem_cfg.long_term_max_length
+        self._retention_days = mem_cfg.retention_days
+        # 同一轮次重试 / 反思循环会重复检索，结果短时缓存
+        self._search_cache = AsyncTTLCache(ttl=30, maxsize=256)
+        # 每个用户的缓存代数（计入缓存 key）：写入记忆后换新，只让该用户的旧结果失效
+        # 代数取自全局递增计数器，被 LRU 淘汰的用户再次出现时拿到新值，不会命中旧缓存
+        self._search_generations: OrderedDict[str, int] = OrderedDict()
+        self._generation_counter = itertools.count()
         self._mem0 = None
         self._active_channel: str = ""
+        # Mem0 调用会被放到线程池执行，初始化需跨线程互斥
+        self._init_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # 懒加载：首次访问时根据 memory_provider 初始化对应通道
@@ -132,7 +196,10 @@ class MemoryService:
     @property
     def mem0(self):
         if self._mem0 is None:
-            self._mem0 = self._init_mem0()
+            with self._init_lock:
+                # 双重检查：等锁期间其他线程可能已完成初始化
+                if self._mem0 is None:
+                    self._mem0 = self._init_mem0()
         return self._mem0
 
     def _init_mem0(self):
@@ -200,18 +267,7 @@ class MemoryService:
     @staticmethod
     def _log_ollama_unavailable(reason: str, fix: str) -> None:
         """输出结构化的 Ollama 不可用告警，并提示修复方法。"""
-        logger.warning(
-            "\n"
-            "╔══════════════════════════════════════════════════════════╗\n"
-            "║        ⚠️  Mem0 本地通道 (Ollama) 不可用                 ║\n"
-            "╠══════════════════════════════════════════════════════════╣\n"
-            f"║  原因: {reason:<52}║\n"
-            f"║  修复: {fix:<52}║\n"
-            "╠══════════════════════════════════════════════════════════╣\n"
-            "║  系统已自动降级为内存字典 (FallbackMemory)               ║\n"
-            "║  本次会话记忆在程序重启后将不会保留                      ║\n"
-            "╚══════════════════════════════════════════════════════════╝"
-        )
+        logger.warning(_OLLAMA_UNAVAILABLE_BANNER.format(reason=reason, fix=fix))
 
     def _diagnose_ollama_error(self, e: Exception, mem_cfg) -> None:
         """根据异常内容诊断 Ollama/Qdrant 失败的具体原因，输出可操作的修复建议。"""
@@ -266,17 +322,21 @@ class MemoryService:
         根据记忆衰减策略，内容超过 short_term_max_length 时截断。
         """
         try:
-            max_len = self.yaml_config.memory.short_term_max_length
+            max_len = self._short_max
             if len(content) > max_len:
-                content = content[:max_len] + "..."
-
-            result = self.mem0.add(
-                content,
-                user_id=user_id,
-                metadata=metadata or {"timestamp": datetime.now().isoformat()},
-            )
+                content = f"{content[:max_len]}..."
+
+            async with _mem0_semaphore:
+                result = await asyncio.to_thread(
+                    self.mem0.add,
+                    content,
+                    user_id=user_id,
+                    metadata=metadata or {"timestamp": datetime.now().isoformat()},
+                )
+            self._search_generation(user_id, renew=True)
+            # self.mem0 已在上方完成初始化，直接读取通道名
             logger.info(
-                f"[{self.active_channel}] Memory added for user '{user_id}' "
+                f"[{self._active_channel or 'uninit'}] Memory added for user '{user_id}' "
                 f"({len(content)} chars)"
             )
             return result
@@ -285,59 +345,75 @@ class MemoryService:
             logger.error(f"Failed to add memory: {e}")
             return None
 
+    def _search_generation(self, user_id: str, renew: bool = False) -> int:
+        """返回用户当前的检索缓存代数；renew=True 或首次出现时分配新代数"""
+        gens = self._search_generations
+        if renew or user_id not in gens:
+            gens[user_id] = next(self._generation_counter)
+            if len(gens) > _SEARCH_GENERATIONS_MAX_SIZE:
+                gens.popitem(last=False)
+        gens.move_to_end(user_id)
+        return gens[user_id]
+
     async def search_memory(
         self, query: str, user_id: str = "default", limit: int = 10
     ) -> list[dict]:
-        """搜索相关记忆（含记忆衰减过滤）"""
+        """搜索相关记忆（含记忆衰减过滤），短时间内重复的检索直接命中缓存"""
+        key = (user_id, self._search_generation(user_id), query.strip().lower(), limit)
         try:
-            results = self.mem0.search(query, user_id=user_id, limit=limit)
-
-            processed = []
-            max_short = self.yaml_config.memory.long_term_max_length
-            retention_days = self.yaml_config.memory.retention_days
-            cutoff = datetime.now() - timedelta(days=retention_days)
-
-            for item in results:
-                mem_data = item if isinstance(item, dict) else {"memory": str(item)}
-                timestamp_str = (
-                    mem_data.get("metadata", {}).get("timestamp", "")
-                    if isinstance(mem_data.get("metadata"), dict)
-                    else ""
-                )
-
-                # 过期记忆跳过
-                if timestamp_str:
-                    try:
-                        ts = datetime.fromisoformat(timestamp_str)
-                        if ts < cutoff:
-                            continue
-                    except (ValueError, TypeError):
-                        pass
-
-                # 远期记忆压缩为短摘要
-                memory_text = mem_data.get("memory", "")
-                if timestamp_str:
-                    try:
-                        ts = datetime.fromisoformat(timestamp_str)
-                        days_age = (datetime.now() - ts).days
-                        if days_age > 30 and len(memory_text) > max_short:
-                            memory_text = memory_text[:max_short] + "..."
-                    except (ValueError, TypeError):
-                        pass
-
-                processed.append(
-                    {
-                        "memory": memory_text,
-                        "metadata": mem_data.get("metadata", {}),
-                    }
-                )
-
-            return processed
-
+            return await self._search_cache.get_or_load(
+                key, lambda: self._search_and_decay(query, user_id, limit)
+            )
         except Exception as e:
             logger.error(f"Memory search failed: {e}")
             return []
 
+    async def _search_and_decay(
+        self, query: str, user_id: str, limit: int
+    ) -> list[dict]:
+        """调用 Mem0 检索并执行记忆衰减过滤（异常交由调用方处理，失败结果不进缓存）"""
+        async with _mem0_semaphore:
+            results = await asyncio.to_thread(
+                self.mem0.search, query, user_id=user_id, limit=limit
+            )
+
+        processed = []
+        max_short = self._long_max
+        retention_days = self._retention_days
+        now = datetime.now()
+        cutoff = now - timedelta(days=retention_days)
+
+        for item in results:
+            mem_data = item if isinstance(item, dict) else {"memory": str(item)}
+            timestamp_str = (
+                mem_data.get("metadata", {}).get("timestamp", "")
+                if isinstance(mem_data.get("metadata"), dict)
+                else ""
+            )
+
+            memory_text = mem_data.get("memory", "")
+            ts = _parse_timestamp(timestamp_str) if timestamp_str else None
+            if ts is not None:
+                try:
+                    # 过期记忆跳过
+                    if ts < cutoff:
+                        continue
+                    # 远期记忆压缩为短摘要
+                    if (now - ts).days > _LONG_TERM_DAYS and len(memory_text) > max_short:
+                        memory_text = memory_text[:max_short] + "..."
+                except TypeError:
+                    # 带时区与不带时区的时间戳无法比较，按未知时间处理
+                    pass
+
+            processed.append(
+                {
+                    "memory": memory_text,
+                    "metadata": mem_data.get("metadata", {}),
+                }
+            )
+
+        return processed
+
     async def get_context_for_agent(
         self, query: str, user_id: str = "default"
     ) -> str:
@@ -347,10 +423,9 @@ class MemoryService:
         if not memories:
             return "无历史记忆。"
 
-        context_parts = [f"### 历史记忆上下文 [{self.active_channel}]"]
-        for i, mem in enumerate(memories, 1):
-            context_parts.append(f"{i}. {mem['memory']}")
-
+        # search_memory 已触发通道初始化，直接读取通道名
+        context_parts = [f"### 历史记忆上下文 [{self._active_channel}]"]
+        context_parts += [f"{i}. {mem['memory']}" for i, mem in enumerate(memories, 1)]
         return "\n".join(context_parts)
 
     def get_channel_info(self) -> dict:
@@ -371,6 +446,12 @@ class MemoryService:
         }
 
 
+@lru_cache(maxsize=1)
+def get_memory_service() -> MemoryService:
+    """获取进程内共享的 MemoryService 单例（Mem0 通道只初始化一次）"""
+    return MemoryService()
+
+
 # ============================================================
 # 降级实现（内存字典）
 # ============================================================
@@ -380,25 +461,28 @@ class FallbackMemory:
 
     def __init__(self):
         self._store: dict[str, list[dict]] = {}
+        # 与 _store 一一对应的小写文本，写入时计算一次，检索时无需重复 lower()
+        self._lowered: dict[str, list[str]] = {}
 
     def add(
         self, content: str, user_id: str = "default", metadata: dict | None = None
     ):
-        if user_id not in self._store:
-            self._store[user_id] = []
-        self._store[user_id].append(
+        self._store.setdefault(user_id, []).append(
             {
                 "memory": content,
                 "metadata": metadata or {},
             }
         )
+        self._lowered.setdefault(user_id, []).append(content.lower())
         return {"status": "ok", "channel": "fallback"}
 
     def search(
         self, query: str, user_id: str = "default", limit: int = 10
     ) -> list[dict]:
         entries = self._store.get(user_id, [])
-        matched = [e for e in entries if query.lower() in e["memory"].lower()]
+        q = query.lower()
+        lowered = self._lowered.get(user_id, [])
+        matched = [e for e, text in zip(entries, lowered) if q in text]
         if not matched:
             matched = entries
         return matched[-limit:]
@@ -5,14 +5,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
+from functools import lru_cache
 from typing import Any
 
+import httpx
+
 from app.core.config import get_settings, get_yaml_config
 from app.models.patent import Patent
 
 logger = logging.getLogger(__name__)
 
+_SERPAPI_SEARCH_URL = "https://serpapi.com/search.json"
+
 
 class PatentService:
     """专利查询业务服务"""
@@ -21,6 +28,23 @@ class PatentService:
         self.settings = get_settings()
         self.yaml_config = get_yaml_config()
         self.provider = self.yaml_config.data_sources.patent_provider
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """懒加载共享 HTTP 客户端 — 跨请求复用连接池，避免每次调用重新握手"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """关闭共享 HTTP 客户端（应用关闭时调用）"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     async def search_patents(
         self,
@@ -66,7 +90,7 @@ class PatentService:
         language: str | None = None,
     ) -> list[dict[str, Any]]:
         """
-        通过 SerpApi 搜索 Google Patents（google-search-results 包）
+        通过 SerpApi 搜索 Google Patents（直接请求 search.json 接口）
 
         分页：page 为 1-indexed（第一页=1），num 每页最多 100 条
         国家筛选：独立 country 参数，逗号分隔（如 "US,CN,WO"）
@@ -79,54 +103,69 @@ class PatentService:
             logger.warning("SerpApi API key not configured, returning mock data")
             return self._mock_patents(query)
 
-        try:
-            from serpapi import GoogleSearch  # google-search-results 包
+        if max_results <= 0:
+            return []
 
+        try:
             # 每页最多 100 条，max_results <= 100 时只需 1 次请求
             num_per_page = min(max_results, 100)
-            results: list[dict[str, Any]] = []
+
+            base_params: dict[str, Any] = {
+                "engine": "google_patents",
+                "q": query,
+                "api_key": api_key,
+                "num": num_per_page,  # 每页条数（10-100）
+            }
+
+            # 国家筛选：专用 country 参数，逗号分隔
+            if countries:
+                base_params["country"] = ",".join(countries)
+
+            # 排序：new=最新 / old=最旧（注意：不是 Newest/Oldest）
+            if sort:
+                base_params["sort"] = sort
+
+            # 去重分组：不传=Family同族去重；"language"=显示全部公开文本
+            if dups:
+                base_params["dups"] = dups
+
+            # 日期范围
+            if before:
+                base_params["before"] = before  # e.g. "publication:20240101"
+            if after:
+                base_params["after"] = after  # e.g. "filing:20200101"
+
+            # 法律状态 / 专利类型 / 语言
+            if status:
+                base_params["status"] = status  # GRANT / APPLICATION
+            if patent_type:
+                base_params["type"] = patent_type  # PATENT / DESIGN
+            if language:
+                base_params["language"] = language  # ENGLISH / CHINESE / ...
+
             # ⚠️ SerpApi Google Patents 的 page 参数是 1-indexed，page=1 为第一页
-            page_num = 1
-
-            while len(results) < max_results:
-                params: dict[str, Any] = {
-                    "engine": "google_patents",
-                    "q": query,
-                    "api_key": api_key,
-                    "num": num_per_page,  # 每页条数（10-100）
-                    "page": page_num,  # 1-indexed 页码（文档默认值为 1）
-                }
-
-                # 国家筛选：专用 country 参数，逗号分隔
-                if countries:
-                    params["country"] = ",".join(countries)
-
-                # 排序：new=最新 / old=最旧（注意：不是 Newest/Oldest）
-                if sort:
-                    params["sort"] = sort
-
-                # 去重分组：不传=Family同族去重；"language"=显示全部公开文本
-                if dups:
-                    params["dups"] = dups
-
-                # 日期范围
-                if before:
-                    params["before"] = before  # e.g. "publication:20240101"
-                if after:
-                    params["after"] = after  # e.g. "filing:20200101"
-
-                # 法律状态 / 专利类型 / 语言
-                if status:
-                    params["status"] = status  # GRANT / APPLICATION
-                if patent_type:
-                    params["type"] = patent_type  # PATENT / DESIGN
-                if language:
-                    params["language"] = language  # ENGLISH / CHINESE / ...
-
-                search = GoogleSearch(params)
-                data = search.get_dict()
-                organic_results = data.get("organic_results", [])
+            # 先取首页；仅当有下一页且总数表明确有更多结果时，并发请求其余页（每页消耗额度）
+            first_page = await self._fetch_serpapi_page({**base_params, "page": 1})
+            pages: list[dict[str, Any] | BaseException] = [first_page]
+            num_pages = self._serpapi_page_count(first_page, max_results, num_per_page)
+            if num_pages > 1:
+                pages += await asyncio.gather(
+                    *(
+                        self._fetch_serpapi_page({**base_params, "page": page_num})
+                        for page_num in range(2, num_pages + 1)
+                    ),
+                    return_exceptions=True,
+                )
 
+            results: list[dict[str, Any]] = []
+            seen_ids: set[str] = set()
+            for page_num, data in enumerate(pages, 1):
+                if isinstance(data, BaseException):
+                    # 后续页失败保留已获取的结果
+                    logger.warning(f"SerpApi page {page_num} failed: {data}")
+                    break
+
+                organic_results = data.get("organic_results", [])
                 if not organic_results:
                     break  # 无更多结果
 
@@ -134,6 +173,13 @@ class PatentService:
                     if len(results) >= max_results:
                         break
 
+                    # 相邻页可能返回重复专利
+                    patent_id = item.get("patent_id", "")
+                    if patent_id:
+                        if patent_id in seen_ids:
+                            continue
+                        seen_ids.add(patent_id)
+
                     figures = []
                     for fig in item.get("figures", []):
                         if isinstance(fig, dict) and fig.get("thumbnail"):
@@ -146,7 +192,7 @@ class PatentService:
                             "title": item.get("title", ""),
                             "assignee": item.get("assignee", ""),
                             "abstract": item.get("snippet", ""),
-                            "patent_id": item.get("patent_id", ""),
+                            "patent_id": patent_id,
                             "filing_date": item.get("filing_date", ""),
                             "priority_date": item.get("priority_date", ""),
                             "publication_date": item.get("publication_date", ""),
@@ -161,17 +207,10 @@ class PatentService:
                         }
                     )
 
-                # 本页不足 num_per_page → 已到最后一页
+                # 本页不足 num_per_page → 已到最后一页，后续页结果不再合并
                 if len(organic_results) < num_per_page:
                     break
 
-                # SerpApi 无下一页标记 → 停止
-                pagination = data.get("serpapi_pagination", {})
-                if not pagination.get("next"):
-                    break
-
-                page_num += 1
-
             logger.info(
                 f"SerpApi returned {len(results)} patents for q='{query}' "
                 f"country={countries} status={status} sort={sort} dups={dups}"
@@ -182,6 +221,29 @@ class PatentService:
             logger.error(f"SerpApi search failed: {e}")
             return self._mock_patents(query)
 
+    @staticmethod
+    def _serpapi_page_count(
+        first_page: dict[str, Any], max_results: int, num_per_page: int
+    ) -> int:
+        """根据首页的 serpapi_pagination.next 与 total_results 计算需要请求的总页数"""
+        if len(first_page.get("organic_results", [])) < num_per_page:
+            return 1
+        if not first_page.get("serpapi_pagination", {}).get("next"):
+            return 1
+        # 总数未知时不做投机请求
+        total = first_page.get("search_information", {}).get("total_results") or 0
+        if not isinstance(total, int):
+            return 1
+        wanted = math.ceil(max_results / num_per_page)
+        return max(1, min(wanted, math.ceil(total / num_per_page)))
+
+    async def _fetch_serpapi_page(self, params: dict[str, Any]) -> dict[str, Any]:
+        """请求 SerpApi 单页结果（走共享连接池，不阻塞事件循环）"""
+        resp = await self.http.get(_SERPAPI_SEARCH_URL, params=params)
+        resp.raise_for_status()
+        # 无结果时 SerpApi 返回带 error 字段的 200 响应，由调用方按空页处理
+        return resp.json()
+
     async def _search_uspto(self, query: str, max_results: int) -> list[dict[str, Any]]:
         """
         通过 USPTO API 搜索美国专利
@@ -192,40 +254,38 @@ class PatentService:
             return self._mock_patents(query)
 
         try:
-            import httpx
-
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                url = "https://developer.uspto.gov/ibd-api/v1/application/publications"
-                params = {
-                    "searchText": query,
-                    "rows": str(max_results),
-                    "start": "0",
-                }
-
-                resp = await client.get(url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
-
-                results = []
-                for item in data.get("results", [])[:max_results]:
-                    results.append(
-                        {
-                            "title": item.get("inventionTitle", ""),
-                            "assignee": ", ".join(item.get("applicants", []))
-                            if isinstance(item.get("applicants"), list)
-                            else str(item.get("applicants", "")),
-                            "abstract": item.get("abstractText", [None])[0]
-                            if isinstance(item.get("abstractText"), list)
-                            else item.get("abstractText", ""),
-                            "patent_id": item.get("publicationDocumentIdentifier", ""),
-                            "filing_date": item.get("filingDate", ""),
-                            "source": "uspto",
-                            "raw_data": item,
-                        }
-                    )
+            client = self.http
+            url = "https://developer.uspto.gov/ibd-api/v1/application/publications"
+            params = {
+                "searchText": query,
+                "rows": str(max_results),
+                "start": "0",
+            }
 
-                logger.info(f"USPTO returned {len(results)} patents for '{query}'")
-                return results
+            resp = await client.get(url, params=params)
+            resp.raise_for_status()
+            data = resp.json()
+
+            results = []
+            for item in data.get("results", [])[:max_results]:
+                results.append(
+                    {
+                        "title": item.get("inventionTitle", ""),
+                        "assignee": ", ".join(item.get("applicants", []))
+                        if isinstance(item.get("applicants"), list)
+                        else str(item.get("applicants", "")),
+                        "abstract": item.get("abstractText", [None])[0]
+                        if isinstance(item.get("abstractText"), list)
+                        else item.get("abstractText", ""),
+                        "patent_id": item.get("publicationDocumentIdentifier", ""),
+                        "filing_date": item.get("filingDate", ""),
+                        "source": "uspto",
+                        "raw_data": item,
+                    }
+                )
+
+            logger.info(f"USPTO returned {len(results)} patents for '{query}'")
+            return results
 
         except Exception as e:
             logger.error(f"USPTO search failed: {e}")
@@ -263,3 +323,9 @@ class PatentService:
             }
             for p in patents
         ]
+
+
+@lru_cache(maxsize=1)
+def get_patent_service() -> PatentService:
+    """获取进程内共享的 PatentService 单例"""
+    return PatentService()
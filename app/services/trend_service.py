@@ -7,8 +7,10 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
+import httpx
 import pandas as pd
 
 from app.core.config import get_settings, get_yaml_config
@@ -23,6 +25,23 @@ class TrendService:
         self.settings = get_settings()
         self.yaml_config = get_yaml_config()
         self.provider = self.yaml_config.data_sources.trend_provider
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """懒加载共享 HTTP 客户端 — 跨请求复用连接池，避免每次调用重新握手"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """关闭共享 HTTP 客户端（应用关闭时调用）"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     async def fetch_trends(
         self, keywords: list[str], timeframe_months: int | None = None
@@ -108,32 +127,30 @@ class TrendService:
             return self._mock_trends(keywords)
 
         try:
-            import httpx
-
             all_data = []
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                for kw in keywords:
-                    resp = await client.get(
-                        "https://api.rainforestapi.com/request",
-                        params={
-                            "api_key": api_key,
-                            "type": "search",
-                            "amazon_domain": "amazon.com",
-                            "search_term": kw,
-                        },
-                    )
-                    resp.raise_for_status()
-                    data = resp.json()
-
-                    search_results = data.get("search_results", [])
-                    all_data.append(
-                        {
-                            "keyword": kw,
-                            "date": datetime.now().strftime("%Y-%m-%d"),
-                            "value": float(len(search_results)),
-                            "source": "rainforest",
-                        }
-                    )
+            client = self.http
+            for kw in keywords:
+                resp = await client.get(
+                    "https://api.rainforestapi.com/request",
+                    params={
+                        "api_key": api_key,
+                        "type": "search",
+                        "amazon_domain": "amazon.com",
+                        "search_term": kw,
+                    },
+                )
+                resp.raise_for_status()
+                data = resp.json()
+
+                search_results = data.get("search_results", [])
+                all_data.append(
+                    {
+                        "keyword": kw,
+                        "date": datetime.now().strftime("%Y-%m-%d"),
+                        "value": float(len(search_results)),
+                        "source": "rainforest",
+                    }
+                )
 
             return {"data": all_data, "summaries": []}
 
@@ -149,31 +166,29 @@ class TrendService:
             return self._mock_trends(keywords)
 
         try:
-            import httpx
-
             all_data = []
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                for kw in keywords:
-                    resp = await client.get(
-                        "https://api.keepa.com/search",
-                        params={
-                            "key": api_key,
-                            "domain": "1",  # amazon.com
-                            "type": "keyword",
-                            "term": kw,
-                        },
-                    )
-                    resp.raise_for_status()
-                    data = resp.json()
-
-                    all_data.append(
-                        {
-                            "keyword": kw,
-                            "date": datetime.now().strftime("%Y-%m-%d"),
-                            "value": data.get("searchVolume", 0),
-                            "source": "keepa",
-                        }
-                    )
+            client = self.http
+            for kw in keywords:
+                resp = await client.get(
+                    "https://api.keepa.com/search",
+                    params={
+                        "key": api_key,
+                        "domain": "1",  # amazon.com
+                        "type": "keyword",
+                        "term": kw,
+                    },
+                )
+                resp.raise_for_status()
+                data = resp.json()
+
+                all_data.append(
+                    {
+                        "keyword": kw,
+                        "date": datetime.now().strftime("%Y-%m-%d"),
+                        "value": data.get("searchVolume", 0),
+                        "source": "keepa",
+                    }
+                )
 
             return {"data": all_data, "summaries": []}
 
@@ -288,3 +303,9 @@ class TrendService:
             )
 
         return {"data": all_data, "summaries": summaries}
+
+
+@lru_cache(maxsize=1)
+def get_trend_service() -> TrendService:
+    """获取进程内共享的 TrendService 单例（复用 HTTP 连接池）"""
+    return TrendService()